@@ -1,131 +1,539 @@
-import random
-from pieces import Piece
-from rules import is_checkmate, is_stalemate
+import time
+from rules import is_check
+from transposition import TranspositionTable, EXACT, LOWER, UPPER
+from ordering import MoveOrderer, QUIET, MAX_PLY
+from evaluation import evaluate, MG_VALUES
+from stats import SearchStats
+from movegen import see
+from moves import SQUARE_POS, CAPTURE_BIT, PROMOTION_BIT, encode, decode
+from tablebase import WIN, CURSED_WIN, DRAW, BLESSED_LOSS, LOSS
+
+CHECKMATE_SCORE = 100000
+MATE_BOUND = CHECKMATE_SCORE - 1000  # Scores beyond this are mates, stored relative to the node in the table
+TABLEBASE_WIN = MATE_BOUND - MAX_PLY  # Tablebase wins score just below the mates, sooner ones higher
+MAX_DEPTH = 64  # Iterative deepening limit when only a time or node budget is given
+DELTA_MARGIN = 200  # Quiescence skips captures that cannot lift the score to alpha even with this bonus
+INFINITY = CHECKMATE_SCORE + 1
+NULL_MOVE_REDUCTION = 2  # Depth reduction of the null-move search, one more above depth 6
+LMR_MIN_DEPTH = 3  # Late move reductions apply from this depth
+LMR_MIN_MOVES = 3  # ... to quiet moves searched after this many others
+BUDGET_CHECK_MASK = 63  # The budget is checked every 64 nodes, a few milliseconds in pure Python
+
+
+def mate_in(value):
+    """
+    Converts a score to moves to mate from the same point of view: positive when that side mates,
+    negative when it is mated. Returns None when the score is not a mate.
+    """
+    if abs(value) <= MATE_BOUND:
+        return None
+    moves = (CHECKMATE_SCORE - abs(value) + 1) // 2
+    return moves if value > 0 else -moves
+
 
 class AI:
-    def __init__(self, game, color):
+    def __init__(self, game, color, hash_mb=16, book=None, tablebase=None):
         self.game = game
-        self.color = -1  # AI plays as black, adjust if necessary
+        self.color = color
+        self.book = book  # Optional book.OpeningBook consulted before searching
+        self.tablebase = tablebase  # Optional tablebase.Tablebase probed at the root and in the search
+        self.tt = TranspositionTable(hash_mb)
+        self.orderer = MoveOrderer()
+        self.nodes = 0
+        self.qnodes = 0  # Nodes searched by quiescence, included in nodes
+        self.stopped = False
+        self.deadline = None
+        self.max_nodes = None
+        self.completed_depth = 0
+        self.best_value = None
+        self.pv = []
+        self.stop_event = None  # Optional threading/multiprocessing Event; the search stops once it is set
+        self.on_iteration = None  # Optional callback, called with the AI after each completed iteration
+        self.shared_bound = None  # Optional parallel.SharedBound: root scores proven by other processes, by depth
+        # Search features, each of which can be switched off to measure its effect
+        self.use_pvs = True
+        self.use_null_move = True
+        self.use_lmr = True
+        self.use_check_extensions = True
+        self.root_depth = 0
+        self.seldepth = 0
+        self.reset_stats()
+        # Instrumentation: timings of move generation, check tests and evaluation, and a cProfile run of each search
+        self.collect_timings = False
+        self.profile = False
+        self.last_stats = None  # stats.SearchStats of the last search
+
+    def reset_stats(self):
+        # Counters of the current search, read into last_stats when it finishes
+        self.iteration_nodes = []  # Nodes searched by each completed iteration
+        self.null_cutoffs = 0
+        self.lmr_researches = 0
+        self.pvs_researches = 0
+        self.extensions = 0
 
     def make_move(self):
+        """
+        Searches and plays the best move. Returns the move played, or None if there is none.
+        """
         best_move = self.find_best_move()
         if best_move:
-            self.game.move(best_move)
-            self.game.display()  # Display game state after the move
-            print(f"Move executed: {best_move}")
-        
-    def find_best_move(self, depth=3):
-        best_move = None
-        best_value = -float('inf')
-        
-        legal_moves = self.game.get_legal_moves(self.color)
+            self.game.move(decode(self.game, best_move))
+        return best_move
         
-        for move in legal_moves:
-            piece, start_pos, end_pos = move
-            move = piece, start_pos, end_pos[1]
-            
-            # Clona lo stato del tabellone
-            cloned_game = self.game.clone()
-            
-            # Esegui la mossa sulla copia del tabellone
-            cloned_game.move(move)
-            
-            # Crea una nuova istanza dell'AI per il tabellone clonata
-            ai_clone = AI(cloned_game, self.color)
-            eval = ai_clone.minimax(depth - 1, -float('inf'), float('inf'), False)
-            
-            if eval > best_value:
-                best_value = eval
-                best_move = move
+    def find_best_move(self, depth=None, movetime_ms=None, max_nodes=None, moves=None):
+        """
+        Searches the current position with iterative deepening and returns the best move for the AI
+        as a packed move (see moves.py), which Chess.make_move, Chess.move and Chess.move_to_uci accept.
+        depth: The maximum depth; 3 when no budget is given.
+        movetime_ms: Wall-clock budget in milliseconds.
+        max_nodes: Budget in searched nodes.
+        moves: Only search these root moves, packed or in the (piece, from_pos, to_pos[, promotion]) form.
+        When the budget runs out, the move of the last completed iteration is returned; if not even the first
+        iteration completed, the best root move it finished, or the first move in order.
+        The statistics of the search are left in last_stats.
+        """
+        stats = SearchStats(self.tt)
+        if self.profile:
+            stats.start_profile()
+        if self.collect_timings:
+            # Instance attributes shadow the methods for this search only
+            self.generate_moves = stats.timed('movegen', self.generate_moves)
+            self.in_check = stats.timed('legality', self.in_check)
+            self.evaluate_board = stats.timed('eval', self.evaluate_board)
+        try:
+            move = self.iterative_deepening(depth, movetime_ms, max_nodes, moves)
+        finally:
+            for name in ('generate_moves', 'in_check', 'evaluate_board'):
+                self.__dict__.pop(name, None)
+            stats.finish(self)
+            self.last_stats = stats
+        return move
+
+    def iterative_deepening(self, depth, movetime_ms, max_nodes, moves):
+        """
+        Body of find_best_move: deepens the search one ply at a time until the depth or the budget runs out.
+        """
+        if depth is None:
+            depth = MAX_DEPTH if movetime_ms or max_nodes else 3
+        self.deadline = time.perf_counter() + movetime_ms / 1000 if movetime_ms else None
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        self.qnodes = 0
+        self.stopped = False
+        self.completed_depth = 0
+        self.best_value = None
+        self.pv = []
+        self.seldepth = 0
+        self.reset_stats()
+        self.orderer.reset_stats()
+        if moves is None and self.book_move() is not None:
+            return self.pv[0]
+        if moves is None and self.tablebase_move() is not None:
+            return self.pv[0]
+        self.tt.new_search()
+        self.orderer.new_search()
+
+        game = self.game
+        root_moves = game.generate_moves(self.color)
+        if moves is not None:
+            wanted = {move if isinstance(move, int) else encode(game, move) for move in moves}
+            root_moves = [move for move in root_moves if move in wanted]
+        if not root_moves:
+            return None
+        root_moves = [move for _, move in self.orderer.order(game, root_moves, 0)]
+
+        best_move = root_moves[0]
+        for current_depth in range(1, depth + 1):
+            move, value = self.search_root(root_moves, current_depth)
+            if self.stopped:
+                if not self.completed_depth and move is not None:
+                    # Stopped during the first iteration: keep the best of the root moves it finished
+                    best_move = move
+                    self.best_value = value
+                    self.pv = [move]
+                break  # Keep the result of the last completed iteration
+            best_move = move
+            self.best_value = value
+            self.completed_depth = current_depth
+            self.iteration_nodes.append(self.nodes - sum(self.iteration_nodes))
+            self.pv = self.principal_variation(best_move, current_depth)
+            # The next iteration searches the previous best move first
+            root_moves.remove(best_move)
+            root_moves.insert(0, best_move)
+            if self.on_iteration is not None:
+                self.on_iteration(self)
+            if abs(value) > MATE_BOUND:
+                break  # A forced mate was found
         
         return best_move
 
+    def book_move(self):
+        """
+        Picks a move from the opening book, if there is one for the position, and makes it the principal variation.
+        Returns the move, or None when out of book.
+        """
+        if self.book is None:
+            return None
+        move = self.book.pick(self.game)
+        if move is None:
+            return None
+        self.pv = [encode(self.game, move)]
+        return self.pv[0]
+
+    def tablebase_move(self):
+        """
+        In a position covered by the tablebase, picks the move keeping the best outcome, ranked with the DTZ
+        tables: a mate, then the win reaching its next capture or pawn move soonest, a draw, or the loss
+        resisting longest; a win or loss the fifty-move rule would cut short ranks next to the draws.
+        Sets best_value and the principal variation.
+        Returns the move, or None when the position or one of its successors is not covered.
+        """
+        game = self.game
+        if self.tablebase is None or self.tablebase.probe_wdl(game) is None:
+            return None
+        best = None
+        for move in game.generate_moves(game.p_move):
+            game.make_move(move)
+            mated = self.in_check(game.p_move) and not game.generate_moves(game.p_move)
+            dtz = self.tablebase.probe_dtz(game)
+            clock = game.halfmove_clock
+            game.unmake_move()
+            if dtz is None:
+                return None
+            # The opponent's DTZ is negative when it loses; the fifty-move counter left by the move decides
+            # whether the result can be completed
+            if dtz < 0:
+                outcome = WIN if clock - dtz <= 100 else CURSED_WIN
+            elif dtz > 0:
+                outcome = LOSS if clock + dtz <= 100 else BLESSED_LOSS
+            else:
+                outcome = DRAW
+            plies = 1 + abs(dtz) if clock else 1  # To the next zeroing move
+            if mated:
+                rank, value = (WIN + 1, 0, 0), CHECKMATE_SCORE - 1
+            else:
+                # Equal distances go to the move leaving the opponent nearest its own zeroing move when it loses
+                # (the queen promotion over the rook one), or furthest from it when it wins
+                rank = (outcome, -plies, dtz) if outcome > 0 else (outcome, plies, dtz)
+                value = TABLEBASE_WIN - plies if outcome == WIN else -(TABLEBASE_WIN - plies) if outcome == LOSS else 0
+            if best is None or rank > best[0]:
+                best = (rank, value, move)
+        if best is None:
+            return None
+        self.best_value = best[1] * self.color
+        self.pv = [best[2]]
+        return best[2]
+
+    def search_root(self, root_moves, depth):
+        """
+        Searches every root move to the given depth: the first with a full window, the rest
+        with a null window around alpha (PVS), re-searched when they turn out better.
+        With a shared bound, alpha starts just below the best score other processes have proven at
+        this depth, so moves that cannot beat it fail low quickly.
+        Returns the best move and its value (positive for white); when stopped, the best of the moves
+        searched so far, or (None, None).
+        """
+        game = self.game
+        self.root_depth = depth
+        alpha, beta = -INFINITY, INFINITY
+        best_move = None
+        shared = self.shared_bound
+        for index, move in enumerate(root_moves):
+            if shared is not None:
+                alpha = max(alpha, shared.get(depth) - 1)  # A move matching the bound still counts as exact
+            game.make_move(move)
+            if index == 0 or not self.use_pvs:
+                value = -self.negamax(depth - 1, -beta, -alpha, 1)
+            else:
+                value = -self.negamax(depth - 1, -alpha - 1, -alpha, 1)
+                if alpha < value < beta and not self.stopped:
+                    self.pvs_researches += 1
+                    value = -self.negamax(depth - 1, -beta, -alpha, 1)
+            game.unmake_move()
+            if self.stopped:
+                # The interrupted move's value is unreliable; the moves searched before it are exact
+                return best_move, alpha * self.color if best_move is not None else None
+            if value > alpha:
+                alpha = value
+                best_move = move
+                if shared is not None:
+                    shared.update(depth, value)
+        bound = EXACT
+        if best_move is None:
+            # Every move failed low against the shared bound: another process has a better one
+            best_move = root_moves[0]
+            bound = UPPER
+        self.tt.store(game.hash, depth, self.score_to_tt(alpha, 0), bound, best_move)
+        return best_move, alpha * self.color
+
+    def principal_variation(self, best_move, depth):
+        """
+        Follows the best moves stored in the transposition table from the root.
+        """
+        game = self.game
+        pv = [best_move]
+        game.make_move(best_move)
+        while len(pv) < depth:
+            entry = self.tt.probe(game.hash)
+            if entry is None or entry[3] is None:
+                break
+            move = entry[3]
+            if move not in game.generate_moves(game.p_move):
+                break
+            pv.append(move)
+            game.make_move(move)
+        for _ in pv:
+            game.unmake_move()
+        return pv
 
+    def check_budget(self):
+        """
+        Stops the search once the time or node budget is spent, or the stop event is set.
+        Also applies to the first iteration, so a stop or a short movetime is honoured at once.
+        """
+        if (self.deadline is not None and time.perf_counter() >= self.deadline) or \
+                (self.max_nodes is not None and self.nodes >= self.max_nodes) or \
+                (self.stop_event is not None and self.stop_event.is_set()):
+            self.stopped = True
+
+    def generate_moves(self, player):
+        """
+        Returns the legal moves of the player as packed moves.
+        """
+        return self.game.generate_moves(player)
+
+    def in_check(self, player):
+        return is_check(self.game, player)
 
     def evaluate_board(self):
-        piece_values = {
-            'P': 1, 'N': 3, 'B': 3, 'R': 5, 'Q': 9, 'K': 0,
-            'p': -1, 'n': -3, 'b': -3, 'r': -5, 'q': -9, 'k': 0
-        }
-        board_value = 0
+        """
+        Returns the tapered material and piece-square score (centipawns, positive for white).
+        The sums are kept up to date by make_move/unmake_move, so this does not scan the board.
+        """
+        return evaluate(self.game)
 
+    def has_non_pawn_material(self, player):
         for row in self.game.board:
             for piece in row:
-                if isinstance(piece, Piece):
-                    notation = piece.get_notation()
-                    board_value += piece_values.get(notation, 0) * piece.color
-                    
-                    # Evaluate piece position
-                    board_value += self.position_value(piece)
-
-        return board_value
-    
-    def position_value(self, piece):
-        # Simplified position value function that ignores specific positions
-        piece_type = piece.get_notation().lower()
-    
-        # Return a simple value for each piece type
-        if piece_type == 'p':
-            return 1  # Pawns
-        elif piece_type == 'n':
-            return 3  # Knights
-        elif piece_type == 'b':
-            return 3  # Bishops
-        elif piece_type == 'r':
-            return 5  # Rooks
-        elif piece_type == 'q':
-            return 9  # Queens
-        elif piece_type == 'k':
-            return 0  # Kings (usually not evaluated in terms of points)
-        return 0
-
-    def minimax(self, depth, alpha, beta, is_maximizing):
-        if depth == 0 or is_checkmate(self.game, self.color) or is_stalemate(self.game, self.color):
-            return self.evaluate_board()
-    
-        if is_maximizing:
-            max_eval = -float('inf')
-            for move in self.game.get_legal_moves(self.color):
-                piece, start_pos, end_pos = move
-                move = piece, start_pos, end_pos[1]
-    
-                # Clona lo stato del tabellone
-                cloned_game = self.game.clone()
-    
-                # Esegui la mossa nel gioco clonata
-                if not cloned_game.move(move):
-                    continue  # Salta se la mossa non è valida
-    
-                # Crea una nuova istanza dell'AI per il tabellone clonata
-                ai_clone = AI(cloned_game, -self.color)
-                eval = ai_clone.minimax(depth - 1, alpha, beta, False)
-    
-                max_eval = max(max_eval, eval)
-                alpha = max(alpha, eval)
-                if beta <= alpha:
-                    break
-            return max_eval
+                if piece != 0 and piece.color == player and 1 < piece.value < 6:
+                    return True
+        return False
+
+    def negamax(self, depth, alpha, beta, ply, allow_null=True):
+        """
+        Principal variation search of the current position; scores are from the side to move's point of view.
+        Only the first move of a node gets the full window; the others are searched with a null window
+        and re-searched when they beat alpha. Late quiet moves are searched at reduced depth (LMR),
+        a null move that still fails high prunes the node, and checks extend the search by a ply.
+        Every child is played with make_move and taken back with unmake_move, so no node copies the game.
+        Results are cached in the transposition table under the position's Zobrist key.
+        """
+        game = self.game
+        self.nodes += 1
+        if self.nodes & BUDGET_CHECK_MASK == 0:
+            self.check_budget()
+        if self.stopped:
+            return 0
+        player = game.p_move
+        if game.repetitions():
+            return 0  # A repetition inside the search is scored as a draw, cutting off the cycle
+        if game.halfmove_clock >= 100 and not (self.in_check(player) and not self.generate_moves(player)):
+            return 0  # Fifty-move rule, unless the move that reached it was mate
+        if self.tablebase is not None:
+            wdl = self.tablebase.probe_wdl(game)
+            if wdl is not None:
+                # Exact result: a win or loss scores just below the mates, cursed wins and blessed losses draw
+                return TABLEBASE_WIN - ply if wdl == WIN else -(TABLEBASE_WIN - ply) if wdl == LOSS else 0
+        if ply > self.seldepth:
+            self.seldepth = ply
+        if ply >= MAX_PLY - 1:
+            return self.evaluate_board() * player
+
+        in_check = self.in_check(player)
+        if in_check and self.use_check_extensions and ply < 2 * self.root_depth:
+            depth += 1
+            self.extensions += 1
+        if depth <= 0:
+            return self.quiescence(alpha, beta, ply)
+
+        key = game.hash
+        hash_move = None
+        entry = self.tt.probe(key)
+        if entry is not None:
+            entry_depth, score, bound, hash_move, _ = entry
+            if entry_depth >= depth:
+                score = self.score_from_tt(score, ply)
+                if bound == EXACT or (bound == LOWER and score >= beta) or (bound == UPPER and score <= alpha):
+                    return score
+
+        pv_node = beta - alpha > 1
+        # Null move: if passing still fails high, a real move will too. Unsafe in zugzwang, so it is
+        # skipped when the side to move has only pawns left
+        if self.use_null_move and allow_null and not pv_node and not in_check and depth >= 3 and \
+                self.evaluate_board() * player >= beta and self.has_non_pawn_material(player):
+            reduction = NULL_MOVE_REDUCTION + (depth > 6)
+            game.make_null_move()
+            score = -self.negamax(depth - 1 - reduction, -beta, -beta + 1, ply + 1, False)
+            game.unmake_null_move()
+            if self.stopped:
+                return 0
+            if score >= beta:
+                self.null_cutoffs += 1
+                return beta if score > MATE_BOUND else score  # Mates found after passing are not proven
+
+        alpha_orig = alpha
+        best_move = None
+        best_value = -INFINITY
+        moves = self.generate_moves(player)
+        orderer = self.orderer
+        searched = 0
+        for stage, move in orderer.order(game, moves, ply, hash_move):
+            game.make_move(move)
+            if searched == 0:
+                value = -self.negamax(depth - 1, -beta, -alpha, ply + 1)
+            else:
+                reduction = 0
+                if self.use_lmr and depth >= LMR_MIN_DEPTH and searched >= LMR_MIN_MOVES and not in_check and \
+                        stage == QUIET and not self.in_check(game.p_move):
+                    reduction = min(1 if searched < 6 else 2, depth - 2)
+                window = -alpha - 1 if self.use_pvs else -beta
+                value = -self.negamax(depth - 1 - reduction, window, -alpha, ply + 1)
+                if reduction and value > alpha and not self.stopped:
+                    self.lmr_researches += 1
+                    value = -self.negamax(depth - 1, window, -alpha, ply + 1)
+                if self.use_pvs and alpha < value < beta and not self.stopped:
+                    self.pvs_researches += 1
+                    value = -self.negamax(depth - 1, -beta, -alpha, ply + 1)
+            game.unmake_move()
+            orderer.searched[stage] += 1
+            searched += 1
+
+            if value > best_value:
+                best_value = value
+                best_move = move
+            if value > alpha:
+                alpha = value
+            if alpha >= beta:
+                if not self.stopped:
+                    orderer.record_cutoff(move, stage, searched - 1, depth, ply, player)
+                break
+
+        if self.stopped:
+            return 0  # Unfinished: do not store anything
+        if best_move is None:
+            # Checkmate (preferring the quickest) or stalemate
+            return -(CHECKMATE_SCORE - ply) if in_check else 0
+
+        if best_value <= alpha_orig:
+            bound = UPPER
+        elif best_value >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.tt.store(key, depth, self.score_to_tt(best_value, ply), bound, best_move)
+        return best_value
+
+    def quiescence(self, alpha, beta, ply):
+        """
+        Searches only captures and promotions below the horizon, so the static evaluation is never
+        taken in the middle of an exchange. The side to move may stand pat on the static evaluation;
+        captures that cannot reach alpha (delta pruning) or that lose material by SEE are skipped.
+        In check every evasion is searched instead, since standing pat is not an option.
+        Scores are from the side to move's point of view.
+        """
+        game = self.game
+        self.nodes += 1
+        self.qnodes += 1
+        if self.nodes & BUDGET_CHECK_MASK == 0:
+            self.check_budget()
+        if self.stopped:
+            return 0
+        if ply > self.seldepth:
+            self.seldepth = ply
+        player = game.p_move
+        in_check = self.in_check(player)
+        moves = self.generate_moves(player)
+        if in_check:
+            if not moves:
+                return -(CHECKMATE_SCORE - ply)
+            best_value = -INFINITY
         else:
-            min_eval = float('inf')
-            for move in self.game.get_legal_moves(-self.color):
-                piece, start_pos, end_pos = move
-                move = piece, start_pos, end_pos[1]
-    
-                # Clona lo stato del tabellone
-                cloned_game = self.game.clone()
-    
-                # Esegui la mossa nel gioco clonata
-                if not cloned_game.move(move):
-                    continue  # Salta se la mossa non è valida
-    
-                # Crea una nuova istanza dell'AI per il tabellone clonata
-                ai_clone = AI(cloned_game, -self.color)
-                eval = ai_clone.minimax(depth - 1, alpha, beta, True)
-    
-                min_eval = min(min_eval, eval)
-                beta = min(beta, eval)
-                if beta <= alpha:
-                    break
-            return min_eval
+            # Stand pat: the side to move is assumed to have at least one move as good as doing nothing
+            best_value = stand_pat = self.evaluate_board() * player
+            if best_value >= beta or ply >= MAX_PLY - 1:
+                return best_value
+            alpha = max(alpha, best_value)
+            moves = [move for move in moves if move & (CAPTURE_BIT | PROMOTION_BIT)]
+        orderer = self.orderer
+        for move in sorted(moves, key=lambda move: orderer.mvv_lva(game, move), reverse=True):
+            if not in_check:
+                if move & PROMOTION_BIT and move >> 12 & 3 != 3:
+                    continue  # Under-promotions are left to the main search
+                to_pos = SQUARE_POS[move >> 6 & 63]
+                victim = game.board[to_pos[0]][to_pos[1]]
+                gain = MG_VALUES[victim.value] if victim != 0 else MG_VALUES[1] if move & CAPTURE_BIT else 0
+                if not move & PROMOTION_BIT:
+                    # Delta pruning: even winning the victim with a margin to spare cannot reach alpha
+                    if stand_pat + gain + DELTA_MARGIN <= alpha:
+                        continue
+                    if see(game, move) < 0:
+                        continue  # Losing capture
+            game.make_move(move)
+            value = -self.quiescence(-beta, -alpha, ply + 1)
+            game.unmake_move()
+            if value > best_value:
+                best_value = value
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+        return best_value
+
+    @staticmethod
+    def score_to_tt(score, ply):
+        # Mate scores are stored as distance from this node rather than from the root
+        if score > MATE_BOUND:
+            return score + ply
+        if score < -MATE_BOUND:
+            return score - ply
+        return score
+
+    @staticmethod
+    def score_from_tt(score, ply):
+        if score > MATE_BOUND:
+            return score - ply
+        if score < -MATE_BOUND:
+            return score + ply
+        return score
+
+
+BENCHMARK_POSITIONS = (
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+    'r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3',
+    'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+    'r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10',
+)
 
 
+if __name__ == '__main__':
+    import argparse
+    from board import Chess
+    parser = argparse.ArgumentParser(description='Compare search features at equal depth (nodes, time, branching factor).')
+    parser.add_argument('--depth', type=int, default=4)
+    args = parser.parse_args()
+    features = ('use_pvs', 'use_null_move', 'use_lmr', 'use_check_extensions')
+    configurations = [('all features', ())] + [(f'without {name[4:]}', (name,)) for name in features] + [('plain alpha-beta', features)]
+    for label, disabled in configurations:
+        nodes = 0
+        ratios = []
+        start = time.perf_counter()
+        for fen in BENCHMARK_POSITIONS:
+            game = Chess(fen)
+            ai = AI(game, game.p_move)
+            for name in disabled:
+                setattr(ai, name, False)
+            ai.find_best_move(args.depth)
+            nodes += ai.last_stats.nodes
+            ratios.append(ai.last_stats.mean_ebf)
+        elapsed = time.perf_counter() - start
+        print(f"{label:26} nodes {nodes:9}  time {elapsed:7.2f}s  mean EBF {sum(ratios) / len(ratios):5.2f}")
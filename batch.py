@@ -0,0 +1,125 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from board import Chess
+from ai import AI, mate_in
+from evaluation import evaluate
+
+
+def read_positions(lines):
+    """
+    Lazily parses EPD/FEN lines, yielding (line number, FEN, id) for each position.
+    Blank lines and '#' comments are skipped; EPD operations other than 'id' are ignored.
+    """
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        fields = line.split(None, 4)
+        position = ' '.join(fields[:4])
+        rest = fields[4] if len(fields) > 4 else ''
+        # A FEN carries two move counters where an EPD carries its operations
+        counters = rest.split()[:2]
+        if len(counters) == 2 and counters[0].isdigit() and counters[1].isdigit():
+            position += ' ' + ' '.join(counters)
+            rest = ''
+        position_id = None
+        for operation in rest.split(';'):
+            operation = operation.strip()
+            if operation.startswith('id '):
+                position_id = operation[3:].strip().strip('"')
+        yield number, position, position_id
+
+
+def score_fields(value):
+    # Scores are reported from the side to move's point of view, in centipawns or moves to mate
+    mate = mate_in(value)
+    return {'score': value} if mate is None else {'mate': mate}
+
+
+def analyse(number, fen, position_id, depth, movetime_ms, max_nodes, hash_mb, static):
+    """
+    Analyses one position; runs in a worker process. Returns the JSON-ready result.
+    static: Only return the static evaluation instead of searching.
+    """
+    result = {'line': number, 'id': position_id, 'fen': fen}
+    start = time.perf_counter()
+    try:
+        game = Chess(fen)
+    except (KeyError, ValueError, IndexError):
+        game = None
+    if game is None or game.kings[1] is None or game.kings[-1] is None:
+        result['error'] = 'invalid position'
+        return result
+    if static:
+        result.update(score_fields(evaluate(game) * game.p_move))
+    else:
+        ai = AI(game, game.p_move, hash_mb)
+        move = ai.find_best_move(depth, movetime_ms, max_nodes)
+        result['bestmove'] = Chess.move_to_uci(move) if move else None
+        if move and ai.best_value is not None:
+            result.update(score_fields(ai.best_value * game.p_move))
+            result['depth'] = ai.completed_depth
+            result['pv'] = [Chess.move_to_uci(pv_move) for pv_move in ai.pv]
+        result['nodes'] = ai.nodes
+    result['time_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return result
+
+
+def run_batch(lines, output, workers=1, depth=None, movetime_ms=None, max_nodes=None, hash_mb=16, static=False):
+    """
+    Analyses every position of an iterable of EPD/FEN lines and writes one JSON line per position, in input order.
+    Positions are read lazily and at most a few per worker are in flight, so memory stays flat
+    however long the input is.
+    Returns the number of positions analysed.
+    """
+    args = (depth, movetime_ms, max_nodes, hash_mb, static)
+    count = 0
+    if workers <= 1:
+        for position in read_positions(lines):
+            output.write(json.dumps(analyse(*position, *args)) + '\n')
+            count += 1
+        return count
+
+    pending = deque()
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        for position in read_positions(lines):
+            pending.append(executor.submit(analyse, *position, *args))
+            if len(pending) >= 2 * workers:
+                # Waiting on the oldest result keeps the output in input order
+                output.write(json.dumps(pending.popleft().result()) + '\n')
+                count += 1
+        while pending:
+            output.write(json.dumps(pending.popleft().result()) + '\n')
+            count += 1
+    return count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Analyse EPD/FEN positions and write the results as JSON lines.')
+    parser.add_argument('input', nargs='?', default='-', help="EPD/FEN file, or '-' for stdin")
+    parser.add_argument('-o', '--output', default='-', help="JSONL file, or '-' for stdout")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--depth', type=int)
+    parser.add_argument('--movetime', type=int, help='Budget per position in milliseconds')
+    parser.add_argument('--nodes', type=int, help='Budget per position in nodes')
+    parser.add_argument('--hash', type=int, default=16, help='Transposition table size per worker in MB')
+    parser.add_argument('--eval', action='store_true', help='Only report the static evaluation')
+    args = parser.parse_args()
+
+    source = sys.stdin if args.input == '-' else open(args.input)
+    target = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        start = time.perf_counter()
+        total = run_batch(source, target, args.workers, args.depth, args.movetime, args.nodes, args.hash, args.eval)
+        print(f"{total} positions in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
@@ -0,0 +1,381 @@
+from array import array
+from moves import DOUBLE_PUSH, KING_CASTLE, QUEEN_CASTLE, CAPTURE, EN_PASSANT, PROMOTION
+from core import BoardCore, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, PROMOTION_PIECES, \
+    WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE
+
+# Squares are numbered a1 = 0 ... h8 = 63 (little-endian rank-file mapping), as in core.py.
+
+MASK64 = 0xFFFFFFFFFFFFFFFF
+A_FILE = 0x0101010101010101
+B_FILE = 0x0202020202020202
+C2_H7_DIAGONAL = 0x0080402010080400
+
+# Castling rights kept when a move starts or ends on a square
+CASTLING_MASK = array('B', [15] * 64)
+CASTLING_MASK[4] = 15 & ~(WHITE_KINGSIDE | WHITE_QUEENSIDE)
+CASTLING_MASK[7] = 15 & ~WHITE_KINGSIDE
+CASTLING_MASK[0] = 15 & ~WHITE_QUEENSIDE
+CASTLING_MASK[60] = 15 & ~(BLACK_KINGSIDE | BLACK_QUEENSIDE)
+CASTLING_MASK[63] = 15 & ~BLACK_KINGSIDE
+CASTLING_MASK[56] = 15 & ~BLACK_QUEENSIDE
+
+# Rook (from, to) squares for each king castling destination
+CASTLING_ROOKS = {6: (7, 5), 2: (0, 3), 62: (63, 61), 58: (56, 59)}
+
+
+def _leaper_attacks(steps):
+    table = []
+    for square in range(64):
+        rank, file = square >> 3, square & 7
+        attacks = 0
+        for dr, df in steps:
+            if 0 <= rank + dr < 8 and 0 <= file + df < 8:
+                attacks |= 1 << ((rank + dr) * 8 + file + df)
+        table.append(attacks)
+    return table
+
+
+def _line_mask(square, dr, df):
+    # Squares on the line through square in both directions, excluding the square itself
+    mask = 0
+    for sign in (1, -1):
+        rank, file = (square >> 3) + dr * sign, (square & 7) + df * sign
+        while 0 <= rank < 8 and 0 <= file < 8:
+            mask |= 1 << (rank * 8 + file)
+            rank, file = rank + dr * sign, file + df * sign
+    return mask
+
+
+def _slide(square, occupied, directions):
+    # Reference ray walk, used only to build the lookup tables
+    attacks = 0
+    for dr, df in directions:
+        rank, file = (square >> 3) + dr, (square & 7) + df
+        while 0 <= rank < 8 and 0 <= file < 8:
+            attacks |= 1 << (rank * 8 + file)
+            if occupied & (1 << (rank * 8 + file)):
+                break
+            rank, file = rank + dr, file + df
+    return attacks
+
+
+def _a_file_attacks():
+    table = [[0] * 64 for _ in range(8)]
+    for rank in range(8):
+        for occupancy in range(64):
+            inner = 0
+            for bit in range(6):
+                if occupancy & (1 << bit):
+                    inner |= 1 << ((bit + 1) * 8)
+            index = ((inner * C2_H7_DIAGONAL) & MASK64) >> 58
+            table[rank][index] = _slide(rank * 8, inner, [(1, 0), (-1, 0)])
+    return table
+
+
+KNIGHT_ATTACKS = _leaper_attacks([(1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)])
+KING_ATTACKS = _leaper_attacks([(1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)])
+PAWN_ATTACKS = (_leaper_attacks([(1, -1), (1, 1)]), _leaper_attacks([(-1, -1), (-1, 1)]))  # White, black
+
+RANK_MASKS = [_line_mask(square, 0, 1) for square in range(64)]
+FILE_MASKS = [_line_mask(square, 1, 0) for square in range(64)]
+DIAGONAL_MASKS = [_line_mask(square, 1, 1) for square in range(64)]
+ANTI_DIAGONAL_MASKS = [_line_mask(square, 1, -1) for square in range(64)]
+
+# Kindergarten lookups: the six inner occupancy bits of a rank or diagonal are gathered into
+# an index by one multiplication, then mapped to attacks replicated on every rank.
+FILL_UP_ATTACKS = [[(_slide(file, occupancy << 1, [(0, 1), (0, -1)]) & 0xFF) * A_FILE
+                    for occupancy in range(64)] for file in range(8)]
+A_FILE_ATTACKS = _a_file_attacks()
+
+
+def _line_attacks(occupied, mask, square):
+    return mask & FILL_UP_ATTACKS[square & 7][(((mask & occupied) * B_FILE) & MASK64) >> 58]
+
+
+def file_attacks(occupied, square):
+    file = square & 7
+    occupied = A_FILE & (occupied >> file)
+    return A_FILE_ATTACKS[square >> 3][((occupied * C2_H7_DIAGONAL) & MASK64) >> 58] << file
+
+
+def bishop_attacks(occupied, square):
+    return _line_attacks(occupied, DIAGONAL_MASKS[square], square) | \
+        _line_attacks(occupied, ANTI_DIAGONAL_MASKS[square], square)
+
+
+def rook_attacks(occupied, square):
+    return _line_attacks(occupied, RANK_MASKS[square], square) | file_attacks(occupied, square)
+
+
+def squares(bitboard):
+    """
+    Yields the squares of the set bits of a bitboard, lowest first.
+    """
+    while bitboard:
+        lowest = bitboard & -bitboard
+        yield lowest.bit_length() - 1
+        bitboard ^= lowest
+
+
+def _line_tables():
+    # LINE[a][b] is the whole line through two aligned squares and BETWEEN[a][b] the squares strictly
+    # between them; both are empty when the squares share no rank, file or diagonal
+    line = [[0] * 64 for _ in range(64)]
+    between = [[0] * 64 for _ in range(64)]
+    for masks, directions in ((RANK_MASKS, [(0, 1), (0, -1)]), (FILE_MASKS, [(1, 0), (-1, 0)]),
+                              (DIAGONAL_MASKS, [(1, 1), (-1, -1)]), (ANTI_DIAGONAL_MASKS, [(1, -1), (-1, 1)])):
+        for a in range(64):
+            for b in squares(masks[a]):
+                line[a][b] = masks[a] | 1 << a
+                between[a][b] = _slide(a, 1 << b, directions) & _slide(b, 1 << a, directions)
+    return line, between
+
+
+LINE, BETWEEN = _line_tables()
+
+
+class BitboardChess(BoardCore):
+    def clear(self):
+        """
+        Empties the bitboards.
+        """
+        self.bitboards = [[0] * 7, [0] * 7]  # Per side (white, black) and piece type
+        self.occupied = [0, 0]  # Per side
+        self.squares = array('b', bytes(64))  # Piece code on each square, for captures
+
+    def _put(self, square, code):
+        side = 0 if code > 0 else 1
+        bit = 1 << square
+        self.bitboards[side][abs(code)] |= bit
+        self.occupied[side] |= bit
+        self.squares[square] = code
+
+    def _remove(self, square):
+        code = self.squares[square]
+        side = 0 if code > 0 else 1
+        bit = 1 << square
+        self.bitboards[side][abs(code)] ^= bit
+        self.occupied[side] ^= bit
+        self.squares[square] = 0
+        return code
+
+    def piece_at(self, square):
+        """
+        Returns the piece code on a square.
+        """
+        return self.squares[square]
+
+    def attackers(self, square, color, occupied=None):
+        """
+        Returns the bitboard of the pieces of the given color that attack a square.
+        """
+        if occupied is None:
+            occupied = self.occupied[0] | self.occupied[1]
+        side = 0 if color == 1 else 1
+        pieces = self.bitboards[side]
+        diagonal = pieces[BISHOP] | pieces[QUEEN]
+        straight = pieces[ROOK] | pieces[QUEEN]
+        return (PAWN_ATTACKS[1 - side][square] & pieces[PAWN]) | (KNIGHT_ATTACKS[square] & pieces[KNIGHT]) | \
+            (KING_ATTACKS[square] & pieces[KING]) | \
+            (bishop_attacks(occupied, square) & diagonal if diagonal else 0) | \
+            (rook_attacks(occupied, square) & straight if straight else 0)
+
+    def is_square_attacked(self, square, color):
+        """
+        Checks whether the pieces of the given color attack a square.
+        """
+        return self.attackers(square, color) != 0
+
+    def king_square(self, color):
+        return self.bitboards[0 if color == 1 else 1][KING].bit_length() - 1
+
+    def in_check(self, color=None):
+        """
+        Checks whether the king of the given color (the side to move by default) is attacked.
+        """
+        if color is None:
+            color = self.p_move
+        return self.is_square_attacked(self.king_square(color), -color)
+
+    def pseudo_legal_moves(self):
+        """
+        Generates the moves of the side to move as packed ints,
+        without checking whether they leave the king in check.
+        """
+        color = self.p_move
+        side = 0 if color == 1 else 1
+        pieces = self.bitboards[side]
+        own = self.occupied[side]
+        enemy = self.occupied[1 - side]
+        occupied = own | enemy
+        empty = ~occupied & MASK64
+        moves = []
+        append = moves.append
+
+        # Pawns, set-wise
+        pawns = pieces[PAWN]
+        if color == 1:
+            single = (pawns << 8) & empty
+            double = ((single & 0xFF0000) << 8) & empty
+            forward, last_rank = 8, 0xFF00000000000000
+        else:
+            single = (pawns >> 8) & empty
+            double = ((single & 0xFF0000000000) >> 8) & empty
+            forward, last_rank = -8, 0xFF
+        for to in squares(single & ~last_rank):
+            append((to - forward) | to << 6)
+        for to in squares(double):
+            append((to - 2 * forward) | to << 6 | DOUBLE_PUSH << 12)
+        for to in squares(single & last_rank):
+            for flag in (11, 10, 9, 8):
+                append((to - forward) | to << 6 | flag << 12)
+        target = enemy | (1 << self.en_passant if self.en_passant is not None else 0)
+        for frm in squares(pawns):
+            for to in squares(PAWN_ATTACKS[side][frm] & target):
+                if to == self.en_passant:
+                    append(frm | to << 6 | EN_PASSANT << 12)
+                elif (1 << to) & last_rank:
+                    for flag in (15, 14, 13, 12):
+                        append(frm | to << 6 | flag << 12)
+                else:
+                    append(frm | to << 6 | CAPTURE << 12)
+
+        # Pieces, square by square through the attack tables
+        not_own = ~own & MASK64
+        for kind in (KNIGHT, BISHOP, ROOK, QUEEN, KING):
+            for frm in squares(pieces[kind]):
+                if kind == KNIGHT:
+                    attacks = KNIGHT_ATTACKS[frm]
+                elif kind == BISHOP:
+                    attacks = bishop_attacks(occupied, frm)
+                elif kind == ROOK:
+                    attacks = rook_attacks(occupied, frm)
+                elif kind == QUEEN:
+                    attacks = bishop_attacks(occupied, frm) | rook_attacks(occupied, frm)
+                else:
+                    attacks = KING_ATTACKS[frm]
+                attacks &= not_own
+                for to in squares(attacks & enemy):
+                    append(frm | to << 6 | CAPTURE << 12)
+                for to in squares(attacks & empty):
+                    append(frm | to << 6)
+
+        # Castling
+        rights = self.castle_rights >> (0 if color == 1 else 2) & 3
+        if rights:
+            base = 0 if color == 1 else 56
+            if not self.is_square_attacked(base + 4, -color):
+                if rights & 1 and not occupied & (0x60 << base) \
+                        and not self.is_square_attacked(base + 5, -color) and not self.is_square_attacked(base + 6, -color):
+                    append((base + 4) | (base + 6) << 6 | KING_CASTLE << 12)
+                if rights & 2 and not occupied & (0x0E << base) \
+                        and not self.is_square_attacked(base + 3, -color) and not self.is_square_attacked(base + 2, -color):
+                    append((base + 4) | (base + 2) << 6 | QUEEN_CASTLE << 12)
+        return moves
+
+    def generate_moves(self):
+        """
+        Generates the legal moves of the side to move as packed ints.
+        Checkers and pinned pieces are found once from the king, so moves are filtered without playing them;
+        only en passant, which can uncover a check along the rank of both pawns, is still tried out.
+        """
+        color = self.p_move
+        side = 0 if color == 1 else 1
+        enemy = self.bitboards[1 - side]
+        occupied = self.occupied[0] | self.occupied[1]
+        king = self.king_square(color)
+
+        # A piece is pinned when it is the only piece between the king and an enemy slider
+        pinned = 0
+        snipers = (rook_attacks(0, king) & (enemy[ROOK] | enemy[QUEEN])) | \
+            (bishop_attacks(0, king) & (enemy[BISHOP] | enemy[QUEEN]))
+        for sniper in squares(snipers):
+            blockers = BETWEEN[king][sniper] & occupied
+            if blockers and not blockers & (blockers - 1):
+                pinned |= blockers & self.occupied[side]
+
+        # Squares where a piece other than the king may land: anywhere, on the checker or on the check line
+        checkers = self.attackers(king, -color)
+        if not checkers:
+            targets = MASK64
+        elif checkers & (checkers - 1):
+            targets = 0  # Double check: only the king moves
+        else:
+            targets = checkers | BETWEEN[king][checkers.bit_length() - 1]
+
+        without_king = occupied ^ (1 << king)  # So the king cannot hide behind itself from a slider
+        line = LINE[king]
+        legal = []
+        append = legal.append
+        for move in self.pseudo_legal_moves():
+            frm = move & 63
+            to = (move >> 6) & 63
+            if frm == king:
+                flags = move >> 12
+                if flags == KING_CASTLE or flags == QUEEN_CASTLE or not self.attackers(to, -color, without_king):
+                    append(move)  # Castling already checks the squares the king crosses
+            elif move >> 12 == EN_PASSANT:
+                self.make(move)
+                if not self.in_check(color):
+                    append(move)
+                self.unmake()
+            elif targets >> to & 1 and (not pinned >> frm & 1 or line[frm] >> to & 1):
+                append(move)
+        return legal
+
+    def make(self, move):
+        """
+        Plays a packed move in place and pushes its undo record.
+        """
+        color = self.p_move
+        frm = move & 63
+        to = (move >> 6) & 63
+        flags = move >> 12
+        captured = self.squares[to]
+        self.stack.append((move, captured, self.castle_rights, self.en_passant))
+
+        if captured:
+            self._remove(to)
+        piece = self._remove(frm)
+        if flags & PROMOTION:
+            piece = PROMOTION_PIECES[flags & 3] * color
+        self._put(to, piece)
+
+        self.en_passant = None
+        if flags == DOUBLE_PUSH:
+            self.en_passant = (frm + to) >> 1
+        elif flags == EN_PASSANT:
+            self._remove(to - 8 * color)
+        elif flags == KING_CASTLE or flags == QUEEN_CASTLE:
+            rook_from, rook_to = CASTLING_ROOKS[to]
+            self._put(rook_to, self._remove(rook_from))
+
+        self.castle_rights &= CASTLING_MASK[frm] & CASTLING_MASK[to]
+        self.p_move = -color
+
+    def unmake(self):
+        """
+        Takes back the last packed move played with make.
+        """
+        move, captured, castle_rights, en_passant = self.stack.pop()
+        color = -self.p_move
+        frm = move & 63
+        to = (move >> 6) & 63
+        flags = move >> 12
+
+        piece = self._remove(to)
+        if flags & PROMOTION:
+            piece = PAWN * color
+        self._put(frm, piece)
+        if captured:
+            self._put(to, captured)
+
+        if flags == EN_PASSANT:
+            self._put(to - 8 * color, -PAWN * color)
+        elif flags == KING_CASTLE or flags == QUEEN_CASTLE:
+            rook_from, rook_to = CASTLING_ROOKS[to]
+            self._put(rook_from, self._remove(rook_to))
+
+        self.castle_rights = castle_rights
+        self.en_passant = en_passant
+        self.p_move = color
@@ -1,7 +1,25 @@
-from pieces import Piece, Pawn, Knight, Bishop, Rook, Queen, King
-from rules import is_valid_move, is_castling_move, is_checkmate, is_stalemate, handle_end_game
+from pieces import Pawn, Knight, Bishop, Rook, Queen, King
+from rules import is_valid_move, is_castling_move
+from mailbox import MailboxChess
+from bitboard import BitboardChess
+from movegen import legal_moves
+from moves import SQUARE_POS, PROMOTION_NOTATIONS, to_uci, decode
+from zobrist import PIECE_KEYS, SIDE_KEY, CASTLING_KEYS, EN_PASSANT_KEYS, compute_hash
+from evaluation import MG_TABLE, EG_TABLE, PHASE_WEIGHTS, compute_scores
 import copy
 
+# Castling rights (indexes into Chess.castling) lost when a piece leaves or lands on these squares
+CASTLING_RIGHTS = {
+    (7, 4): (0, 1), (7, 7): (0,), (7, 0): (1,),
+    (0, 4): (2, 3), (0, 7): (2,), (0, 0): (3,)
+}
+
+# Rook (from, to) squares for each king castling destination
+CASTLING_ROOKS = {
+    (7, 6): ((7, 7), (7, 5)), (7, 2): ((7, 0), (7, 3)),
+    (0, 6): ((0, 7), (0, 5)), (0, 2): ((0, 0), (0, 3))
+}
+
 class Chess:
     def __init__(self, EPD='rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq -'):
         """
@@ -24,20 +42,31 @@ class Chess:
         """
         self.log = []  
         self.init_pos = EPD  
-        self.EPD_table = {}  
         self.p_move = 1  
         self.castling = [1, 1, 1, 1]  
         self.en_passant = None  
+        self.last_move = None
+        self.stack = []  # Undo records pushed by make_move
+        self.history = []  # Zobrist keys of every position of the game, the current one last
+        self.kings = {1: None, -1: None}  # King positions, tracked by make_move
         self.board = [[0] * 8 for _ in range(8)]  
+        self.hash = 0  # Zobrist key of the position, updated incrementally by make_move
+        self.mg_score = 0  # Material and piece-square sums (white positive), updated incrementally
+        self.eg_score = 0
+        self.phase = 0
+        self.halfmove_clock = 0  # Half-moves since the last capture or pawn move, for the fifty-move rule
+        self.fullmove_number = 1
+        self.placement = None  # Cached piece placement field of to_fen, cleared by make_move
         self.load_EPD(EPD)
 
     def load_EPD(self, EPD):
         """
-        Loads the initial chess setup from the EPD string.
-        EPD: A string representing the initial chess setup in EPD format.
+        Loads the initial chess setup from an EPD string or a full six-field FEN string.
+        EPD: A string representing the initial chess setup in EPD format, optionally followed by
+             the halfmove clock and fullmove number of FEN.
         """
-        data = EPD.split(' ')
-        if len(data) == 4:
+        data = EPD.split()
+        if 4 <= len(data) <= 6:
             for x, rank in enumerate(data[0].split('/')):
                 y = 0
                 for p in rank:
@@ -48,10 +77,18 @@ class Chess:
                         color = 1 if p.isupper() else -1
                         # Set the piece position
                         self.board[x][y] = piece_class(self, color, (x, y))
+                        if piece_class is King:
+                            self.kings[color] = (x, y)
                         y += 1
             self.p_move = 1 if data[1] == 'w' else -1
             self.castling = [1 if c in data[2] else 0 for c in "KQkq"]
             self.en_passant = None if data[3] == '-' else self.board_2_array(data[3])
+            self.halfmove_clock = int(data[4]) if len(data) > 4 else 0
+            self.fullmove_number = int(data[5]) if len(data) > 5 else 1
+            self.placement = None  # Written out by placement_field, so unusual input (e.g. "44") is normalised
+            self.hash = compute_hash(self)
+            self.history = [self.hash]
+            self.mg_score, self.eg_score, self.phase = compute_scores(self)
             return True
         else:
             return False
@@ -82,97 +119,299 @@ class Chess:
         pos: A string representing a position in chess notation (e.g. 'a1', 'h8').
         """
         if len(pos) == 2 and pos[0] in 'abcdefgh' and pos[1] in '12345678':
-            return int(pos[1]) - 1, ord(pos[0]) - ord('a')
+            return 8 - int(pos[1]), ord(pos[0]) - ord('a')
         else:
             return None
 
-    def move(self, move, player=None):
-        if move:
-            piece, from_pos, to_pos = move
-            if from_pos and to_pos:
-                captured_piece = self.board[to_pos[0]][to_pos[1]]  # Identify the captured piece (if any)
-                special_move = None
-    
-                # Check if the move is a castling move
-                if is_castling_move(self, move):
-                    self.execute_castling(move)
-                    special_move = "castling"
-                    captured_piece = None  # Castling does not capture any piece
-    
-                    # Log the move
-                    if player is not None:  # Only for human players
-                        print(f"Executing castling move: {piece.get_notation()} from {from_pos} to {to_pos}")
-                    self.log.append((piece, from_pos, to_pos, captured_piece, special_move))
-                else:
-                    # Check if the move is valid
-                    is_valid, reason = is_valid_move(self, move)
-                    if is_valid:
-                        if player is not None:  # Only for human players
-                            print(f"Executing move: {piece.get_notation()} from {from_pos} to {to_pos}")
-    
-                        # Handle en passant
-                        if isinstance(piece, Pawn) and abs(to_pos[1] - from_pos[1]) == 1 and to_pos[0] - from_pos[0] == piece.color:
-                            if self.board[to_pos[0]][to_pos[1]] == 0:
-                                captured_piece = self.board[from_pos[0]][to_pos[1]]  # Pawn captured en passant
-                                self.board[from_pos[0]][to_pos[1]] = 0
-                                special_move = "en passant"
-                                if player is not None:  # Only for human players
-                                    print("En passant capture executed.")
-    
-                        # Move the piece to the new position
-                        piece.move(from_pos, to_pos)
-    
-                        # Handle pawn promotion
-                        if isinstance(piece, Pawn) and (to_pos[0] == 0 or to_pos[0] == 7):
-                            self.board[to_pos[0]][to_pos[1]] = Queen(self, piece.color)  # Promote to Queen
-                            if player is not None:  # Only for human players
-                                print("Pawn promoted to Queen.\n")
-    
-                        # Change the player's turn
-                        self.p_move *= -1
-                        self.last_move = move
-    
-                        # Check for checkmate or stalemate
-                        if is_checkmate(self, self.p_move):
-                            if player is not None:  # Only for human players
-                                print("Checkmate! The game is over.\n")
-                            handle_end_game(self)
-                        elif is_stalemate(self, self.p_move):
-                            if player is not None:  # Only for human players
-                                print("Stalemate! The game is over.\n")
-                            handle_end_game(self)
-                        else:
-                            if player is not None:  # Only for human players
-                                print("Move executed successfully!\n")
-    
-                        # Log the move
-                        self.log.append((piece, from_pos, to_pos, captured_piece, special_move))
-                    else:
-                        if player is not None:  # Only for human players
-                            print(f"Invalid move: {reason}\n")
+    @staticmethod
+    def array_2_board(pos):
+        """
+        Converts a (row, column) tuple of the board matrix to chess notation (e.g. (7, 0) -> 'a1').
+        """
+        return 'abcdefgh'[pos[1]] + str(8 - pos[0])
+
+    def placement_field(self):
+        """
+        Returns the piece placement field of the FEN string, cached until the next move.
+        """
+        if self.placement is None:
+            ranks = []
+            for row in self.board:
+                rank = ''
+                empty = 0
+                for piece in row:
+                    if piece == 0:
+                        empty += 1
+                        continue
+                    if empty:
+                        rank += str(empty)
+                        empty = 0
+                    rank += piece.get_notation().upper() if piece.color == 1 else piece.get_notation().lower()
+                ranks.append(rank + str(empty) if empty else rank)
+            self.placement = '/'.join(ranks)
+        return self.placement
+
+    def to_EPD(self):
+        """
+        Writes the current position as a four-field EPD string (placement, side, castling, en passant).
+        """
+        castling = ''.join(c for c, right in zip("KQkq", self.castling) if right) or '-'
+        en_passant = self.array_2_board(self.en_passant) if self.en_passant else '-'
+        return f"{self.placement_field()} {'w' if self.p_move == 1 else 'b'} {castling} {en_passant}"
+
+    def to_fen(self):
+        """
+        Writes the current position as a full FEN string, including the halfmove clock and fullmove number.
+        """
+        return f"{self.to_EPD()} {self.halfmove_clock} {self.fullmove_number}"
+
+    @classmethod
+    def move_to_uci(cls, move):
+        """
+        Writes a move in the (piece, from_pos, to_pos[, promotion]) form, or a packed move, as a UCI string (e.g. 'e2e4', 'e7e8q').
+        """
+        if isinstance(move, int):
+            return to_uci(move)
+        name = cls.array_2_board(move[1]) + cls.array_2_board(move[2])
+        return name + move[3].lower() if len(move) > 3 else name
+
+    def parse_uci(self, text):
+        """
+        Finds the legal move of the side to move written as a UCI string.
+        Returns it in the (piece, from_pos, to_pos[, promotion]) form, or None if there is no such move.
+        """
+        for piece, start_pos, end_pos in self.get_legal_moves(self.p_move):
+            move = (piece, start_pos) + end_pos[1:]
+            if self.move_to_uci(move) == text.lower():
+                return move
+        return None
+
+    def move(self, move):
+        """
+        Validates and plays a move, logging it for undo_last_move. Never prints or asks for input.
+        move: A (piece, from_pos, to_pos) tuple, optionally followed by the promotion notation, or a packed move.
+        Returns a tuple containing a boolean (whether the move was played) and a string describing the outcome.
+        """
+        if isinstance(move, int):
+            move = decode(self, move)
+        if not move or not move[1] or not move[2]:
+            return False, "The move is incomplete."
+        piece, from_pos, to_pos = move[:3]
+
+        # Check if the move is a castling move
+        if is_castling_move(self, move):
+            self.execute_castling(move)
+        else:
+            # Check if the move is valid
+            is_valid, reason = is_valid_move(self, move)
+            if not is_valid:
+                return False, reason
+            # Move the piece, handling en passant and promotion
+            self.make_move(move)
+
+        captured_piece, special_move = self.stack[-1][3:5]
+        self.last_move = move
+        self.log.append((piece, from_pos, to_pos, captured_piece or None, special_move))
+        return True, "The move is valid."
+
+    def make_move(self, move):
+        """
+        Plays a move in place, without validation or output, and pushes an undo record for unmake_move.
+        move: A (piece, from_pos, to_pos) tuple, optionally followed by the promotion notation ('Q' by default),
+              or a packed move (see moves.py), as played by the search.
+        """
+        board = self.board
+        if move.__class__ is int:
+            from_pos, to_pos = SQUARE_POS[move & 63], SQUARE_POS[move >> 6 & 63]
+            promotion = PROMOTION_NOTATIONS[move >> 12 & 3] if move >> 15 else 'Q'
+        else:
+            from_pos, to_pos = move[1], move[2]
+            promotion = move[3] if len(move) > 3 else 'Q'
+        fr, fc = from_pos
+        tr, tc = to_pos
+        piece = board[fr][fc]
+        captured = board[tr][tc]
+        special = None
+        en_passant = self.en_passant
+        castling = tuple(self.castling)
+        has_moved = piece.has_moved
+        old_hash = self.hash
+        scores = (self.mg_score, self.eg_score, self.phase)
+        clock = (self.halfmove_clock, self.placement)
+        keys = PIECE_KEYS[piece.color]
+        mg_table = MG_TABLE[piece.color]
+        eg_table = EG_TABLE[piece.color]
+        h = old_hash ^ keys[piece.value][fr * 8 + fc] ^ SIDE_KEY
+        mg = self.mg_score - mg_table[piece.value][fr * 8 + fc]
+        eg = self.eg_score - eg_table[piece.value][fr * 8 + fc]
+        phase = self.phase
+        if captured != 0:
+            h ^= PIECE_KEYS[captured.color][captured.value][tr * 8 + tc]
+            mg -= MG_TABLE[captured.color][captured.value][tr * 8 + tc]
+            eg -= EG_TABLE[captured.color][captured.value][tr * 8 + tc]
+            phase -= PHASE_WEIGHTS[captured.value]
+
+        self.en_passant = None
+        if en_passant:
+            h ^= EN_PASSANT_KEYS[en_passant[1]]
+        if isinstance(piece, Pawn):
+            if to_pos == en_passant and captured == 0:
+                # The captured pawn sits beside the moving pawn, not on the target square
+                captured = board[fr][tc]
+                board[fr][tc] = 0
+                h ^= PIECE_KEYS[captured.color][1][fr * 8 + tc]
+                mg -= MG_TABLE[captured.color][1][fr * 8 + tc]
+                eg -= EG_TABLE[captured.color][1][fr * 8 + tc]
+                special = "en passant"
+            elif abs(tr - fr) == 2:
+                self.en_passant = ((fr + tr) // 2, fc)
+                h ^= EN_PASSANT_KEYS[fc]
+        elif isinstance(piece, King):
+            self.kings[piece.color] = to_pos
+            if abs(tc - fc) == 2:
+                rook_from, rook_to = CASTLING_ROOKS[to_pos]
+                rook = board[rook_from[0]][rook_from[1]]
+                board[rook_to[0]][rook_to[1]] = rook
+                board[rook_from[0]][rook_from[1]] = 0
+                rook.position = rook_to
+                rook.has_moved = True
+                h ^= keys[4][rook_from[0] * 8 + rook_from[1]] ^ keys[4][rook_to[0] * 8 + rook_to[1]]
+                mg += mg_table[4][rook_to[0] * 8 + rook_to[1]] - mg_table[4][rook_from[0] * 8 + rook_from[1]]
+                eg += eg_table[4][rook_to[0] * 8 + rook_to[1]] - eg_table[4][rook_from[0] * 8 + rook_from[1]]
+                special = "castling"
+
+        board[tr][tc] = piece
+        board[fr][fc] = 0
+        piece.position = to_pos
+        piece.has_moved = True
+
+        if isinstance(piece, Pawn) and (tr == 0 or tr == 7):
+            promoted = self.piece_classes[promotion](self, piece.color, to_pos)
+            board[tr][tc] = promoted
+            h ^= keys[promoted.value][tr * 8 + tc]
+            mg += mg_table[promoted.value][tr * 8 + tc]
+            eg += eg_table[promoted.value][tr * 8 + tc]
+            phase += PHASE_WEIGHTS[promoted.value]
+            special = "promotion"
+        else:
+            h ^= keys[piece.value][tr * 8 + tc]
+            mg += mg_table[piece.value][tr * 8 + tc]
+            eg += eg_table[piece.value][tr * 8 + tc]
+
+        # Moving the king or a rook, or capturing a rook, removes castling rights
+        for square in (from_pos, to_pos):
+            if square in CASTLING_RIGHTS:
+                for right in CASTLING_RIGHTS[square]:
+                    if self.castling[right]:
+                        self.castling[right] = 0
+                        h ^= CASTLING_KEYS[right]
+
+        self.halfmove_clock = 0 if captured != 0 or isinstance(piece, Pawn) else self.halfmove_clock + 1
+        if piece.color == -1:
+            self.fullmove_number += 1
+        self.placement = None
+        self.p_move *= -1
+        self.hash = h
+        self.history.append(h)
+        self.mg_score, self.eg_score, self.phase = mg, eg, phase
+        self.stack.append((piece, from_pos, to_pos, captured, special, has_moved, castling, en_passant, old_hash, scores, clock))
+
+    def unmake_move(self):
+        """
+        Takes back the last move played with make_move, restoring the board and game state from its undo record.
+        """
+        piece, from_pos, to_pos, captured, special, has_moved, castling, en_passant, old_hash, scores, clock = self.stack.pop()
+        board = self.board
+        fr, fc = from_pos
+        tr, tc = to_pos
+
+        board[fr][fc] = piece
+        piece.position = from_pos
+        piece.has_moved = has_moved
+        if isinstance(piece, King):
+            self.kings[piece.color] = from_pos
+        if special == "en passant":
+            board[tr][tc] = 0
+            board[fr][tc] = captured
+        else:
+            board[tr][tc] = captured
+            if special == "castling":
+                rook_from, rook_to = CASTLING_ROOKS[to_pos]
+                rook = board[rook_to[0]][rook_to[1]]
+                board[rook_from[0]][rook_from[1]] = rook
+                board[rook_to[0]][rook_to[1]] = 0
+                rook.position = rook_from
+                rook.has_moved = False
+
+        self.castling[:] = castling
+        self.en_passant = en_passant
+        self.hash = old_hash
+        self.history.pop()
+        self.mg_score, self.eg_score, self.phase = scores
+        self.halfmove_clock, self.placement = clock
+        if piece.color == -1:
+            self.fullmove_number -= 1
+        self.p_move *= -1
+
+    def make_null_move(self):
+        """
+        Passes the turn without moving, for null-move pruning in the search; taken back with unmake_null_move.
+        The halfmove clock restarts, so repetitions are never counted across a null move.
+        """
+        h = self.hash ^ SIDE_KEY
+        if self.en_passant:
+            h ^= EN_PASSANT_KEYS[self.en_passant[1]]
+        self.stack.append((None, self.en_passant, self.hash, self.halfmove_clock))
+        self.en_passant = None
+        self.hash = h
+        self.history.append(h)
+        self.halfmove_clock = 0
+        self.p_move *= -1
+
+    def unmake_null_move(self):
+        _, self.en_passant, self.hash, self.halfmove_clock = self.stack.pop()
+        self.history.pop()
+        self.p_move *= -1
+
+    def repetitions(self):
+        """
+        Returns how many times the current position occurred earlier in the game.
+        Only positions since the last capture or pawn move (the halfmove clock) can repeat,
+        so the scan stops there and looks only at positions with the same side to move.
+        """
+        history = self.history
+        current = len(history) - 1
+        key = history[current]
+        first = current - min(self.halfmove_clock, current)
+        count = 0
+        # A position can recur at the earliest four plies later
+        for index in range(current - 4, first - 1, -2):
+            if history[index] == key:
+                count += 1
+        return count
 
     def get_legal_moves(self, player):
         """
-        Gets all possible legal moves for the specified player.
+        Gets all legal moves for the specified player.
         """
-        legal_moves = []
-        for y, row in enumerate(self.board):
-            for x, piece in enumerate(row):
-                if isinstance(piece, Piece) and piece.color == player:
-                    piece_moves = piece.movement(player, (y, x))
-                    legal_moves.extend([(piece, (y, x), move) for move in piece_moves])
-        
-        castling_moves = [(None, from_pos, to_pos) for from_pos, to_pos in self.get_castling_moves()]
-        legal_moves.extend(castling_moves)
-        
-        return legal_moves
+        return legal_moves(self, player)
+
+    def generate_moves(self, player=None):
+        """
+        Gets all legal moves for the specified player (the current player by default) as packed moves.
+        """
+        return legal_moves(self, self.p_move if player is None else player, packed=True)
 
-    def get_castling_moves(self):
+    def get_castling_moves(self, player=None):
         """
-        Generates castling moves for the current player.
+        Generates castling moves for the specified player (the current player by default)
+        whose rights are intact and whose squares between king and rook are empty.
+        Whether the king passes through check is decided by movegen.castling_moves.
         """
+        if player is None:
+            player = self.p_move
         castling_moves = []
-        if self.p_move == 1:
+        if player == 1:
             if self.castling[0]:  # Short castling for white
                 if self.board[7][5] == 0 and self.board[7][6] == 0:
                     castling_moves.append(((7, 4), (7, 6)))  # Add the king's move
@@ -188,71 +427,22 @@ class Chess:
                     castling_moves.append(((0, 4), (0, 2)))  # Add the king's move
         return castling_moves
     
-    def execute_castling(game, move):
-        piece, from_pos, to_pos = move
-        if to_pos[1] == 2:  # Queenside castling
-            rook_pos = (from_pos[0], 0)
-            new_rook_pos = (from_pos[0], 3)
-        else:  # Kingside castling
-            rook_pos = (from_pos[0], 7)
-            new_rook_pos = (from_pos[0], 5)
-    
-        # Move the rook
-        game.board[new_rook_pos[0]][new_rook_pos[1]] = game.board[rook_pos[0]][rook_pos[1]]
-        game.board[rook_pos[0]][rook_pos[1]] = 0
-        game.board[new_rook_pos[0]][new_rook_pos[1]].has_moved = True
-    
-        # Move the king
-        game.board[to_pos[0]][to_pos[1]] = game.board[from_pos[0]][from_pos[1]]
-        game.board[from_pos[0]][from_pos[1]] = 0
-        game.board[to_pos[0]][to_pos[1]].has_moved = True
-    
-        game.p_move *= -1
-        print("Castling move executed!")
+    def execute_castling(self, move):
+        self.make_move(move)
 
     def undo_last_move(self):
-        if self.log:
-            last_move = self.log.pop()
-            piece, from_pos, to_pos, captured_piece, special_move = last_move
-            
-            # Restore player turn
-            self.p_move *= -1
-            print("Last move undone.\n")
-            
-            # Restore the board state
-            self.board[from_pos[0]][from_pos[1]] = piece
-            self.board[to_pos[0]][to_pos[1]] = captured_piece
-    
-            # Restore specific rules if applicable
-            if special_move == "castling":
-                # Restore the king's and rook's position based on the castling type
-                if to_pos[1] == from_pos[1] + 2:  # Kingside castling
-                    # King moved from from_pos to to_pos, and the rook also moved
-                    self.board[from_pos[0]][from_pos[1] + 2] = 0  # Clear new king's position
-                    self.board[from_pos[0]][from_pos[1] + 1] = 0  # Clear new rook's position
-                    self.board[from_pos[0]][from_pos[1]] = piece  # Restore king to original position
-                    self.board[from_pos[0]][from_pos[1] + 3] = Rook(self, piece.color)  # Restore rook to original position
-                elif to_pos[1] == from_pos[1] - 2:  # Queenside castling
-                    # King moved from from_pos to to_pos, and the rook also moved
-                    self.board[from_pos[0]][from_pos[1] - 2] = 0  # Clear new king's position
-                    self.board[from_pos[0]][from_pos[1] - 1] = 0  # Clear new rook's position
-                    self.board[from_pos[0]][from_pos[1]] = piece  # Restore king to original position
-                    self.board[from_pos[0]][from_pos[1] - 4] = Rook(self, piece.color)  # Restore rook to original position
-    
-            elif special_move == "en passant":
-                # Restore the pawn that was captured en passant
-                if piece.color == 1:  # White pawn
-                    self.board[to_pos[0] + 1][to_pos[1]] = Pawn(self, 1)  # Restore white pawn
-                else:  # Black pawn
-                    self.board[to_pos[0] - 1][to_pos[1]] = Pawn(self, -1)  # Restore black pawn
-    
-            elif isinstance(piece, Queen) and (from_pos[0] == 0 or from_pos[0] == 7):
-                # Undo pawn promotion: replace queen with pawn
-                self.board[to_pos[0]][to_pos[1]] = Pawn(self, piece.color)
-    
-        else:
-            print("No moves to undo.\n")
-            
-    def exit_game(self):
-        print("Exiting the game.\n")
-        handle_end_game(self)
+        """
+        Takes back the last move played with move.
+        Returns False if there is no move to undo.
+        """
+        if not self.log:
+            return False
+        self.log.pop()
+        self.unmake_move()
+        self.last_move = self.log[-1][:3] if self.log else None
+        return True
+
+
+# Board cores exposing the Chess API (load_EPD, display, get_legal_moves, move, make_move/unmake_move);
+# the mailbox and bitboard cores name pieces by their signed piece codes instead of Piece objects
+BACKENDS = {'objects': Chess, 'mailbox': MailboxChess, 'bitboard': BitboardChess}
@@ -0,0 +1,181 @@
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+from board import Chess
+from pieces import King
+from pgn import read_games, san_tokens, parse_san
+from polyglot import polyglot_key
+
+# Polyglot entry: key, move, weight, learn; big-endian, sorted by key
+ENTRY = struct.Struct('>QHHI')
+KEY = struct.Struct('>Q')
+PROMOTIONS = ' NBRQ'
+# Polyglot writes castling as the king capturing its own rook
+CASTLING_TARGETS = {(7, 6): (7, 7), (7, 2): (7, 0), (0, 6): (0, 7), (0, 2): (0, 0)}
+CASTLING_DESTINATIONS = {((king[0], 4), rook): king for king, rook in CASTLING_TARGETS.items()}
+
+
+def encode_move(move):
+    """
+    Packs a move in the (piece, from_pos, to_pos[, promotion]) form into a Polyglot move:
+    to file, to rank, from file, from rank and promotion, three bits each from the low bits up.
+    """
+    piece, from_pos, to_pos = move[:3]
+    if isinstance(piece, King) and abs(to_pos[1] - from_pos[1]) == 2:
+        to_pos = CASTLING_TARGETS[to_pos]
+    promotion = PROMOTIONS.index(move[3]) if len(move) > 3 else 0
+    return to_pos[1] | (7 - to_pos[0]) << 3 | from_pos[1] << 6 | (7 - from_pos[0]) << 9 | promotion << 12
+
+
+def decode_move(game, code):
+    """
+    Finds the legal move of the side to move matching a Polyglot move, or None.
+    """
+    from_pos = (7 - (code >> 9 & 7), code >> 6 & 7)
+    to_pos = (7 - (code >> 3 & 7), code & 7)
+    piece = game.board[from_pos[0]][from_pos[1]]
+    if piece == 0:
+        return None
+    if isinstance(piece, King):
+        to_pos = CASTLING_DESTINATIONS.get((from_pos, to_pos), to_pos)
+    promotion = PROMOTIONS[code >> 12 & 7].strip()
+    for legal_piece, start_pos, end_pos in game.get_legal_moves(game.p_move):
+        if start_pos == from_pos and end_pos[1] == to_pos and (end_pos[2] if len(end_pos) > 2 else '') == promotion:
+            return (legal_piece, start_pos) + end_pos[1:]
+    return None
+
+
+class OpeningBook:
+    def __init__(self, path, seed=None):
+        """
+        Opening book in the Polyglot .bin layout, memory-mapped and binary-searched by key.
+        Mapping the file costs no load time, and the pages are shared by every process using the book.
+        Entries are keyed by polyglot_key, so books built by other Polyglot tools can be used as they are.
+        seed: Seed of the weighted random choice, for reproducible games.
+        """
+        self.path = path
+        self.rng = random.Random(seed)
+        self.file = open(path, 'rb')
+        # An empty file cannot be mapped
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(path) else b''
+        self.size = len(self.data) // ENTRY.size
+
+    def entries(self, key):
+        """
+        Returns the (move, weight) pairs stored for a key.
+        """
+        data = self.data
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if KEY.unpack_from(data, middle * ENTRY.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        result = []
+        while low < self.size:
+            entry_key, move, weight, _ = ENTRY.unpack_from(data, low * ENTRY.size)
+            if entry_key != key:
+                break
+            result.append((move, weight))
+            low += 1
+        return result
+
+    def moves(self, game):
+        """
+        Returns the legal book moves of the position as (move, weight) pairs.
+        """
+        result = []
+        for code, weight in self.entries(polyglot_key(game)):
+            move = decode_move(game, code)
+            if move is not None and weight > 0:
+                result.append((move, weight))
+        return result
+
+    def pick(self, game):
+        """
+        Chooses a book move at random, in proportion to the weights. Returns None when out of book.
+        """
+        moves = self.moves(game)
+        if not moves:
+            return None
+        return self.rng.choices([move for move, _ in moves], [weight for _, weight in moves])[0]
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+
+def build_book(pgn_paths, out_path, max_plies=20, min_weight=1):
+    """
+    Builds a book from PGN files: every move of the first max_plies plies of each game is counted,
+    2 for a move by the winner, 1 for a draw or an unfinished game, 0 for the loser.
+    Moves whose total weight is below min_weight are dropped. Returns the number of entries written.
+    """
+    weights = {}
+    for path in pgn_paths:
+        with open(path) as stream:
+            for headers, movetext in read_games(stream):
+                result = headers.get('Result', '*')
+                game = Chess(headers.get('FEN', 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'))
+                for ply, san in enumerate(san_tokens(movetext)):
+                    if ply >= max_plies:
+                        break
+                    move = parse_san(game, san)
+                    if move is None:
+                        break  # Keep the moves read so far
+                    if result == '1-0':
+                        points = 2 if game.p_move == 1 else 0
+                    elif result == '0-1':
+                        points = 2 if game.p_move == -1 else 0
+                    else:
+                        points = 1
+                    entry = (polyglot_key(game), encode_move(move))
+                    weights[entry] = weights.get(entry, 0) + points
+                    game.make_move(move)
+
+    # Weights are scaled per position so the largest fits the 16-bit field
+    by_key = {}
+    for (key, move), weight in weights.items():
+        if weight >= min_weight:
+            by_key.setdefault(key, []).append((move, weight))
+    count = 0
+    with open(out_path, 'wb') as file:
+        for key in sorted(by_key):
+            moves = by_key[key]
+            scale = max(1, -(-max(weight for _, weight in moves) // 0xFFFF))
+            for move, weight in sorted(moves, key=lambda item: item[1], reverse=True):
+                file.write(ENTRY.pack(key, move, max(1, weight // scale), 0))
+                count += 1
+    return count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build or probe a Polyglot-format opening book.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='Build a book from PGN files')
+    build.add_argument('pgn', nargs='+')
+    build.add_argument('-o', '--output', default='book.bin')
+    build.add_argument('--plies', type=int, default=20)
+    build.add_argument('--min-weight', type=int, default=1)
+    probe = commands.add_parser('probe', help='List the book moves of a position')
+    probe.add_argument('book')
+    probe.add_argument('--fen', default='rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        print(f"{build_book(args.pgn, args.output, args.plies, args.min_weight)} entries written to {args.output}")
+    else:
+        book = OpeningBook(args.book)
+        game = Chess(args.fen)
+        moves = book.moves(game)
+        total = sum(weight for _, weight in moves) or 1
+        for move, weight in sorted(moves, key=lambda item: item[1], reverse=True):
+            print(f"{Chess.move_to_uci(move)} {weight} ({100 * weight / total:.1f}%)")
+        if not moves:
+            print("Out of book.", file=sys.stderr)
+        book.close()
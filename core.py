@@ -0,0 +1,161 @@
+from moves import SQUARE_POS, PROMOTION_NOTATIONS, PROMOTION_FLAGS, square as pos_square, \
+    DOUBLE_PUSH, KING_CASTLE, QUEEN_CASTLE, CAPTURE, EN_PASSANT, PROMOTION
+
+# Pieces are stored as signed small integers: the absolute value is the piece type
+# (same numbering as Piece.value) and the sign is the color, as in Chess.p_move.
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = 1, 2, 3, 4, 5, 6
+PIECE_CODES = {'P': PAWN, 'N': KNIGHT, 'B': BISHOP, 'R': ROOK, 'Q': QUEEN, 'K': KING}
+NOTATIONS = '.PNBRQK'
+PROMOTION_PIECES = (KNIGHT, BISHOP, ROOK, QUEEN)  # By the low two bits of a promotion's flags (see moves.py)
+
+# Castling rights as bits, in the same KQkq order as Chess.castling
+WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE = 1, 2, 4, 8
+
+
+# What the compact board cores share: setup, display and the Chess-compatible move API. Squares are numbered
+# a1 = 0 ... h8 = 63 and moves are packed as in moves.py; a core supplies its representation
+# (clear, _put, piece_at) and its move generation (generate_moves, make, unmake, in_check).
+class BoardCore:
+    def __init__(self, EPD='rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq -'):
+        """
+        Initializes a new chess game.
+        EPD: A string representing the initial chess setup in EPD format.
+        """
+        self.reset(EPD=EPD)
+
+    def reset(self, EPD='rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq -'):
+        """
+        Resets the game to its initial state.
+        EPD: A string representing the initial chess setup in EPD format.
+        """
+        self.init_pos = EPD
+        self.clear()
+        self.p_move = 1
+        self.castle_rights = 0
+        self.en_passant = None
+        self.stack = []  # Undo records pushed by make
+        self.load_EPD(EPD)
+
+    def load_EPD(self, EPD):
+        """
+        Loads the chess setup from an EPD string or a full FEN string.
+        EPD: A string representing the initial chess setup in EPD format; the FEN move counters are ignored.
+        """
+        data = EPD.split()
+        if not 4 <= len(data) <= 6:
+            return False
+        for row, rank in enumerate(data[0].split('/')):
+            col = 0
+            for p in rank:
+                if p.isdigit():
+                    col += int(p)
+                else:
+                    color = 1 if p.isupper() else -1
+                    self._put((7 - row) * 8 + col, PIECE_CODES[p.upper()] * color)
+                    col += 1
+        self.p_move = 1 if data[1] == 'w' else -1
+        self.castle_rights = sum(1 << i for i, c in enumerate("KQkq") if c in data[2])
+        self.en_passant = None if data[3] == '-' else (int(data[3][1]) - 1) * 8 + ord(data[3][0]) - ord('a')
+        return True
+
+    @property
+    def castling(self):
+        """
+        The castling rights as a [K, Q, k, q] list of flags, like Chess.castling.
+        """
+        return [1 if self.castle_rights & (1 << i) else 0 for i in range(4)]
+
+    def display(self):
+        """
+        Displays the current chessboard.
+        """
+        result = '  a b c d e f g h  \n  ----------------\n'
+        for row in range(8):
+            result += f'{8 - row}|'
+            for col in range(8):
+                code = self.piece_at((7 - row) * 8 + col)
+                notation = NOTATIONS[abs(code)]
+                result += (notation if code >= 0 else notation.lower()) + ' '
+            result += f'|{8 - row}\n'
+        print(result)
+
+    def to_move_tuple(self, move):
+        """
+        Converts a packed move to the (piece, from_pos, (from_pos, to_pos)) form of Chess.get_legal_moves;
+        promotions carry the promotion notation as a third element of the inner tuple.
+        """
+        from_pos = SQUARE_POS[move & 63]
+        target = (from_pos, SQUARE_POS[move >> 6 & 63])
+        if move >> 12 & PROMOTION:
+            target += (PROMOTION_NOTATIONS[move >> 12 & 3],)
+        return self.piece_at(move & 63), from_pos, target
+
+    def from_move_tuple(self, move):
+        """
+        Packs a (piece, from_pos, to_pos[, promotion]) move, as taken by Chess.move, working out its flags
+        from the position; pawns promote to a queen unless told otherwise, as in Chess.make_move.
+        """
+        frm, to = pos_square(move[1]), pos_square(move[2])
+        kind = abs(self.piece_at(frm))
+        flags = CAPTURE if self.piece_at(to) else 0
+        if kind == PAWN:
+            if to >> 3 == 0 or to >> 3 == 7:
+                flags |= PROMOTION_FLAGS[move[3].upper() if len(move) > 3 else 'Q']
+            elif to == self.en_passant and (frm ^ to) & 7:
+                flags = EN_PASSANT
+            elif to - frm == 16 or frm - to == 16:
+                flags = DOUBLE_PUSH
+        elif kind == KING and (to - frm == 2 or frm - to == 2):
+            flags = KING_CASTLE if to > frm else QUEEN_CASTLE
+        return frm | to << 6 | flags << 12
+
+    def get_legal_moves(self, player):
+        """
+        Gets all legal moves for the specified player, in the same form as Chess.get_legal_moves.
+        """
+        if player != self.p_move:
+            # Generate for the other side as if it were its turn
+            en_passant = self.en_passant
+            self.p_move, self.en_passant = player, None
+            moves = self.generate_moves()
+            self.p_move, self.en_passant = -player, en_passant
+        else:
+            moves = self.generate_moves()
+        return [self.to_move_tuple(move) for move in moves]
+
+    def make_move(self, move):
+        """
+        Plays a (piece, from_pos, to_pos[, promotion]) move in place, without validation.
+        """
+        self.make(self.from_move_tuple(move))
+
+    def unmake_move(self):
+        """
+        Takes back the last move played with make_move.
+        """
+        self.unmake()
+
+    def move(self, move):
+        """
+        Validates and plays a move, like Chess.move.
+        move: A (piece, from_pos, to_pos) tuple, optionally followed by the promotion notation, where the piece
+              is the code on the starting square (as given by get_legal_moves), or a packed move (see moves.py).
+        Returns a tuple containing a boolean (whether the move was played) and a string describing the outcome.
+        """
+        if isinstance(move, int):
+            piece, from_pos, target = self.to_move_tuple(move)
+            move = (piece, from_pos) + target[1:]
+        if not move or not move[1] or not move[2]:
+            return False, "The move is incomplete."
+        piece = self.piece_at(pos_square(move[1]))
+        if not piece or move[0] is None:
+            return False, "The starting position is empty."
+        if move[0] != piece:
+            return False, "The starting position does not contain this piece."
+        if (piece > 0) != (self.p_move == 1):
+            return False, "The starting position does not contain a piece of the current player."
+        packed = self.from_move_tuple(move)
+        if packed not in self.generate_moves():
+            return False, "The move is not among the legal moves."
+        self.make(packed)
+        return True, "The move is valid."
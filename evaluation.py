@@ -0,0 +1,119 @@
+# Material in centipawns, indexed by Piece.value (pawn = 1 ... king = 6)
+MG_VALUES = (0, 100, 320, 330, 500, 900, 0)
+EG_VALUES = (0, 120, 290, 310, 520, 930, 0)
+
+# Game phase contributed by each piece; 24 is the full starting set, 0 a pawn ending
+PHASE_WEIGHTS = (0, 0, 1, 1, 2, 4, 0)
+TOTAL_PHASE = 24
+
+# Piece-square tables from white's point of view, laid out like Chess.board (row 0 is rank 8)
+PAWN_MG = (
+      0,   0,   0,   0,   0,   0,   0,   0,
+     50,  50,  50,  50,  50,  50,  50,  50,
+     10,  10,  20,  30,  30,  20,  10,  10,
+      5,   5,  10,  25,  25,  10,   5,   5,
+      0,   0,   0,  20,  20,   0,   0,   0,
+      5,  -5, -10,   0,   0, -10,  -5,   5,
+      5,  10,  10, -20, -20,  10,  10,   5,
+      0,   0,   0,   0,   0,   0,   0,   0)
+PAWN_EG = (
+      0,   0,   0,   0,   0,   0,   0,   0,
+     90,  90,  90,  90,  90,  90,  90,  90,
+     55,  55,  55,  55,  55,  55,  55,  55,
+     30,  30,  30,  30,  30,  30,  30,  30,
+     15,  15,  15,  15,  15,  15,  15,  15,
+      5,   5,   5,   5,   5,   5,   5,   5,
+      0,   0,   0,   0,   0,   0,   0,   0,
+      0,   0,   0,   0,   0,   0,   0,   0)
+KNIGHT = (
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20,   0,   0,   0,   0, -20, -40,
+    -30,   0,  10,  15,  15,  10,   0, -30,
+    -30,   5,  15,  20,  20,  15,   5, -30,
+    -30,   0,  15,  20,  20,  15,   0, -30,
+    -30,   5,  10,  15,  15,  10,   5, -30,
+    -40, -20,   0,   5,   5,   0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50)
+BISHOP = (
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -10,   0,   5,  10,  10,   5,   0, -10,
+    -10,   5,   5,  10,  10,   5,   5, -10,
+    -10,   0,  10,  10,  10,  10,   0, -10,
+    -10,  10,  10,  10,  10,  10,  10, -10,
+    -10,   5,   0,   0,   0,   0,   5, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20)
+ROOK = (
+      0,   0,   0,   0,   0,   0,   0,   0,
+      5,  10,  10,  10,  10,  10,  10,   5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+      0,   0,   0,   5,   5,   0,   0,   0)
+QUEEN = (
+    -20, -10, -10,  -5,  -5, -10, -10, -20,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -10,   0,   5,   5,   5,   5,   0, -10,
+     -5,   0,   5,   5,   5,   5,   0,  -5,
+      0,   0,   5,   5,   5,   5,   0,  -5,
+    -10,   5,   5,   5,   5,   5,   0, -10,
+    -10,   0,   5,   0,   0,   0,   0, -10,
+    -20, -10, -10,  -5,  -5, -10, -10, -20)
+KING_MG = (
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+     20,  20,   0,   0,   0,   0,  20,  20,
+     20,  30,  10,   0,   0,  10,  30,  20)
+KING_EG = (
+    -50, -40, -30, -20, -20, -30, -40, -50,
+    -30, -20, -10,   0,   0, -10, -20, -30,
+    -30, -10,  20,  30,  30,  20, -10, -30,
+    -30, -10,  30,  40,  40,  30, -10, -30,
+    -30, -10,  30,  40,  40,  30, -10, -30,
+    -30, -10,  20,  30,  30,  20, -10, -30,
+    -30, -30,   0,   0,   0,   0, -30, -30,
+    -50, -30, -30, -30, -30, -30, -30, -50)
+
+
+def _build_tables(values, pst):
+    # tables[color][value][row * 8 + column]: signed (white positive) material plus square bonus;
+    # black reads the white table mirrored vertically
+    tables = {}
+    for color in (1, -1):
+        tables[color] = [[0] * 64] + [
+            [color * (values[value] + pst[value - 1][(square if color == 1 else square ^ 56)]) for square in range(64)]
+            for value in range(1, 7)]
+    return tables
+
+
+MG_TABLE = _build_tables(MG_VALUES, (PAWN_MG, KNIGHT, BISHOP, ROOK, QUEEN, KING_MG))
+EG_TABLE = _build_tables(EG_VALUES, (PAWN_EG, KNIGHT, BISHOP, ROOK, QUEEN, KING_EG))
+
+
+def compute_scores(game):
+    """
+    Computes the (middlegame, endgame, phase) sums of a position from scratch.
+    Chess keeps them up to date incrementally; this is used when loading a position.
+    """
+    mg = eg = phase = 0
+    for y, row in enumerate(game.board):
+        for x, piece in enumerate(row):
+            if piece != 0:
+                mg += MG_TABLE[piece.color][piece.value][y * 8 + x]
+                eg += EG_TABLE[piece.color][piece.value][y * 8 + x]
+                phase += PHASE_WEIGHTS[piece.value]
+    return mg, eg, phase
+
+
+def evaluate(game):
+    """
+    Returns the tapered score of the position in centipawns, positive when white is better.
+    """
+    phase = min(game.phase, TOTAL_PHASE)
+    return (game.mg_score * phase + game.eg_score * (TOTAL_PHASE - phase)) // TOTAL_PHASE
@@ -0,0 +1,269 @@
+from array import array
+from moves import DOUBLE_PUSH, KING_CASTLE, QUEEN_CASTLE, CAPTURE, EN_PASSANT, PROMOTION
+from core import BoardCore, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, PROMOTION_PIECES, \
+    WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE
+
+# 0x88 direction offsets; a square is off the board as soon as square & 0x88 is set
+KNIGHT_OFFSETS = (33, 31, 18, 14, -14, -18, -31, -33)
+KING_OFFSETS = (17, 16, 15, 1, -1, -15, -16, -17)
+BISHOP_OFFSETS = (17, 15, -15, -17)
+ROOK_OFFSETS = (16, 1, -1, -16)
+SLIDER_OFFSETS = {BISHOP: BISHOP_OFFSETS, ROOK: ROOK_OFFSETS, QUEEN: BISHOP_OFFSETS + ROOK_OFFSETS}
+
+# Moves are packed as in moves.py, on a1 = 0 ... h8 = 63 squares; these map them to and from 0x88 squares
+TO_0X88 = array('B', [(square >> 3) * 16 + (square & 7) for square in range(64)])
+TO_64 = array('b', [-1] * 128)
+for _square in range(64):
+    TO_64[TO_0X88[_square]] = _square
+
+# Castling rights kept when a move starts or ends on a square
+CASTLING_MASK = array('B', [15] * 128)
+CASTLING_MASK[0x04] = 15 & ~(WHITE_KINGSIDE | WHITE_QUEENSIDE)
+CASTLING_MASK[0x07] = 15 & ~WHITE_KINGSIDE
+CASTLING_MASK[0x00] = 15 & ~WHITE_QUEENSIDE
+CASTLING_MASK[0x74] = 15 & ~(BLACK_KINGSIDE | BLACK_QUEENSIDE)
+CASTLING_MASK[0x77] = 15 & ~BLACK_KINGSIDE
+CASTLING_MASK[0x70] = 15 & ~BLACK_QUEENSIDE
+
+# Rook (from, to) squares for each king castling destination
+CASTLING_ROOKS = {0x06: (0x07, 0x05), 0x02: (0x00, 0x03), 0x76: (0x77, 0x75), 0x72: (0x70, 0x73)}
+
+
+class MailboxChess(BoardCore):
+    def clear(self):
+        """
+        Empties the 0x88 board.
+        """
+        self.board = array('b', bytes(128))
+        self.pieces = {1: [], -1: []}  # Piece lists: occupied squares per side
+        self.kings = {1: None, -1: None}
+
+    def _put(self, square, code):
+        square = TO_0X88[square]
+        color = 1 if code > 0 else -1
+        self.board[square] = code
+        self.pieces[color].append(square)
+        if code * color == KING:
+            self.kings[color] = square
+
+    def piece_at(self, square):
+        """
+        Returns the piece code on a square numbered a1 = 0 ... h8 = 63.
+        """
+        return self.board[TO_0X88[square]]
+
+    def is_square_attacked(self, square, color):
+        """
+        Checks whether the pieces of the given color attack a square, looking outward from it.
+        """
+        board = self.board
+        pawn = PAWN * color
+        for s in ((square - 15, square - 17) if color == 1 else (square + 15, square + 17)):
+            if not s & 0x88 and board[s] == pawn:
+                return True
+        knight = KNIGHT * color
+        for offset in KNIGHT_OFFSETS:
+            s = square + offset
+            if not s & 0x88 and board[s] == knight:
+                return True
+        king = KING * color
+        for offset in KING_OFFSETS:
+            s = square + offset
+            if not s & 0x88 and board[s] == king:
+                return True
+        bishop, rook, queen = BISHOP * color, ROOK * color, QUEEN * color
+        for offset in BISHOP_OFFSETS:
+            s = square + offset
+            while not s & 0x88:
+                p = board[s]
+                if p:
+                    if p == bishop or p == queen:
+                        return True
+                    break
+                s += offset
+        for offset in ROOK_OFFSETS:
+            s = square + offset
+            while not s & 0x88:
+                p = board[s]
+                if p:
+                    if p == rook or p == queen:
+                        return True
+                    break
+                s += offset
+        return False
+
+    def in_check(self, color=None):
+        """
+        Checks whether the king of the given color (the side to move by default) is attacked.
+        """
+        if color is None:
+            color = self.p_move
+        return self.is_square_attacked(self.kings[color], -color)
+
+    def pseudo_legal_moves(self):
+        """
+        Generates the moves of the side to move as packed moves (see moves.py),
+        without checking whether they leave the king in check.
+        """
+        board = self.board
+        color = self.p_move
+        to_64 = TO_64
+        en_passant = TO_0X88[self.en_passant] if self.en_passant is not None else -1
+        moves = []
+        append = moves.append
+        for square in self.pieces[color]:
+            frm = to_64[square]
+            kind = board[square] * color
+            if kind == PAWN:
+                forward = 16 * color
+                to = square + forward
+                promotes = (to >> 4) == (7 if color == 1 else 0)
+                if not board[to]:
+                    if promotes:
+                        for flag in (11, 10, 9, 8):
+                            append(frm | to_64[to] << 6 | flag << 12)
+                    else:
+                        append(frm | to_64[to] << 6)
+                        if (square >> 4) == (1 if color == 1 else 6) and not board[to + forward]:
+                            append(frm | to_64[to + forward] << 6 | DOUBLE_PUSH << 12)
+                for to in (square + forward - 1, square + forward + 1):
+                    if to & 0x88:
+                        continue
+                    if board[to] * color < 0:
+                        if promotes:
+                            for flag in (15, 14, 13, 12):
+                                append(frm | to_64[to] << 6 | flag << 12)
+                        else:
+                            append(frm | to_64[to] << 6 | CAPTURE << 12)
+                    elif to == en_passant:
+                        append(frm | to_64[to] << 6 | EN_PASSANT << 12)
+            elif kind == KNIGHT or kind == KING:
+                for offset in (KNIGHT_OFFSETS if kind == KNIGHT else KING_OFFSETS):
+                    to = square + offset
+                    if not to & 0x88:
+                        target = board[to] * color
+                        if target < 0:
+                            append(frm | to_64[to] << 6 | CAPTURE << 12)
+                        elif not target:
+                            append(frm | to_64[to] << 6)
+            else:
+                for offset in SLIDER_OFFSETS[kind]:
+                    to = square + offset
+                    while not to & 0x88:
+                        target = board[to] * color
+                        if target > 0:
+                            break
+                        if target:
+                            append(frm | to_64[to] << 6 | CAPTURE << 12)
+                            break
+                        append(frm | to_64[to] << 6)
+                        to += offset
+        moves.extend(self._castling_moves())
+        return moves
+
+    def _castling_moves(self):
+        rights = self.castle_rights
+        if not rights:
+            return []
+        board = self.board
+        color = self.p_move
+        base = 0 if color == 1 else 0x70
+        king = 4 if color == 1 else 60  # The king's square in packed-move numbering
+        kingside, queenside = (WHITE_KINGSIDE, WHITE_QUEENSIDE) if color == 1 else (BLACK_KINGSIDE, BLACK_QUEENSIDE)
+        moves = []
+        if rights & (kingside | queenside) and not self.is_square_attacked(base + 4, -color):
+            if rights & kingside and not board[base + 5] and not board[base + 6] \
+                    and not self.is_square_attacked(base + 5, -color) and not self.is_square_attacked(base + 6, -color):
+                moves.append(king | (king + 2) << 6 | KING_CASTLE << 12)
+            if rights & queenside and not board[base + 1] and not board[base + 2] and not board[base + 3] \
+                    and not self.is_square_attacked(base + 3, -color) and not self.is_square_attacked(base + 2, -color):
+                moves.append(king | (king - 2) << 6 | QUEEN_CASTLE << 12)
+        return moves
+
+    def generate_moves(self):
+        """
+        Generates the legal moves of the side to move as packed ints.
+        """
+        color = self.p_move
+        legal = []
+        for move in self.pseudo_legal_moves():
+            self.make(move)
+            if not self.is_square_attacked(self.kings[color], -color):
+                legal.append(move)
+            self.unmake()
+        return legal
+
+    def make(self, move):
+        """
+        Plays a packed move in place and pushes its undo record.
+        """
+        board = self.board
+        color = self.p_move
+        frm = TO_0X88[move & 63]
+        to = TO_0X88[move >> 6 & 63]
+        flags = move >> 12
+        piece = board[frm]
+        captured = board[to]
+        self.stack.append((move, captured, self.castle_rights, self.en_passant))
+
+        board[to] = piece
+        board[frm] = 0
+        own = self.pieces[color]
+        own[own.index(frm)] = to
+        if captured:
+            self.pieces[-color].remove(to)
+
+        self.en_passant = None
+        if flags == DOUBLE_PUSH:
+            self.en_passant = ((move & 63) + (move >> 6 & 63)) >> 1
+        elif flags == EN_PASSANT:
+            captured_square = to - 16 * color
+            board[captured_square] = 0
+            self.pieces[-color].remove(captured_square)
+        elif flags & PROMOTION:
+            board[to] = PROMOTION_PIECES[flags & 3] * color
+        elif flags == KING_CASTLE or flags == QUEEN_CASTLE:
+            rook_from, rook_to = CASTLING_ROOKS[to]
+            board[rook_to] = board[rook_from]
+            board[rook_from] = 0
+            own[own.index(rook_from)] = rook_to
+        if piece == KING * color:
+            self.kings[color] = to
+
+        self.castle_rights &= CASTLING_MASK[frm] & CASTLING_MASK[to]
+        self.p_move = -color
+
+    def unmake(self):
+        """
+        Takes back the last packed move played with make.
+        """
+        move, captured, castle_rights, en_passant = self.stack.pop()
+        board = self.board
+        color = -self.p_move
+        frm = TO_0X88[move & 63]
+        to = TO_0X88[move >> 6 & 63]
+        flags = move >> 12
+        piece = PAWN * color if flags & PROMOTION else board[to]
+
+        board[frm] = piece
+        board[to] = captured
+        own = self.pieces[color]
+        own[own.index(to)] = frm
+        if captured:
+            self.pieces[-color].append(to)
+
+        if flags == EN_PASSANT:
+            captured_square = to - 16 * color
+            board[captured_square] = -PAWN * color
+            self.pieces[-color].append(captured_square)
+        elif flags == KING_CASTLE or flags == QUEEN_CASTLE:
+            rook_from, rook_to = CASTLING_ROOKS[to]
+            board[rook_from] = board[rook_to]
+            board[rook_to] = 0
+            own[own.index(rook_to)] = rook_from
+        if piece == KING * color:
+            self.kings[color] = frm
+
+        self.castle_rights = castle_rights
+        self.en_passant = en_passant
+        self.p_move = color
@@ -1,6 +1,10 @@
 from board import Chess
-from rules import is_checkmate
+from rules import GameResult, game_result
 from ai import AI
+from pgn import save_game
+import sys
+
+PGN_FILE = "games.pgn"
 
 def main():
     print("Welcome to Goldfish!\n")
@@ -21,17 +25,56 @@ def play_with_ai():
     game = Chess()
     ai = AI(game, -1)
     game.display()
-    while not is_checkmate(game, game.p_move):
+    while True:
         if game.p_move == ai.color:
-            ai.make_move()
+            best_move = ai.make_move()
+            game.display()  # Display game state after the move
+            print(f"Move executed: {Chess.move_to_uci(best_move)}")
+            if ai.last_stats is not None:
+                print(f"Search: {ai.last_stats.summary()}")
         else:
             play_turn(game, player="human")
+        check_game_over(game)
 
 def play_two_players():
     game = Chess()
     game.display()
-    while not is_checkmate(game, game.p_move):
+    while True:
         play_turn(game, player="human")
+        check_game_over(game)
+
+def check_game_over(game):
+    """
+    Announces the end of the game, if the position is final, and asks what to do next.
+    """
+    result = game_result(game)
+    if result == GameResult.CHECKMATE:
+        print("Checkmate! The game is over.\n")
+    elif result == GameResult.STALEMATE:
+        print("Stalemate! The game is over.\n")
+    elif result == GameResult.DRAW:
+        print("Draw! The game is over.\n")
+    else:
+        return
+    handle_end_game(game)
+
+def handle_end_game(game):
+    print("Game over!")
+    print("Options:\n[1] Start new game\n[2] Exit\n[3] Save game as PGN")
+    while True:
+        choice = input("Enter your choice: ")
+        if choice == "3":
+            save_game(game, PGN_FILE)
+            print(f"Game saved to {PGN_FILE}.")
+        elif choice == "1":
+            game.reset()
+            game.display()
+            break
+        elif choice == "2":
+            print("Thanks for playing!")
+            sys.exit()
+        else:
+            print("Invalid choice. Please enter 1, 2 or 3.")
 
 def parse_move(game, move_str):
     from_square = (8 - int(move_str[1]), ord(move_str[0]) - ord('a'))
@@ -46,13 +89,23 @@ def play_turn(game, player=None):
         player_color = "white" if game.p_move == 1 else "black"
         print(f"\n{player_color.capitalize()}'s turn")
         
-        move_str = input("Enter your move (e.g. e2e4), 'undo' to undo last move, or 'exit' to quit: ")
+        move_str = input("Enter your move (e.g. e2e4), 'undo' to undo last move, 'save' to save the game, or 'exit' to quit: ")
+        
+        if move_str.lower() == 'save':
+            save_game(game, PGN_FILE)
+            print(f"Game saved to {PGN_FILE}.\n")
+            continue
         
         if move_str.lower() == 'exit':
-            game.exit_game()
+            print("Exiting the game.\n")
+            handle_end_game(game)
+            continue
         
         if move_str.lower() == 'undo':
-            game.undo_last_move()
+            if game.undo_last_move():
+                print("Last move undone.\n")
+            else:
+                print("No moves to undo.\n")
             game.display()
             continue
         
@@ -64,9 +117,20 @@ def play_turn(game, player=None):
                 
                 if move is not None:
                     try:
-                        # Pass the player parameter only if it is the human player's turn
-                        game.move(move, player=player)
-                        print("\n")
+                        is_valid, reason = game.move(move)
+                        if not is_valid:
+                            print(f"Invalid move: {reason}\n")
+                            continue
+                        piece, from_pos, to_pos, _, special_move = game.log[-1]
+                        if special_move == "castling":
+                            print(f"Executing castling move: {piece.get_notation()} from {from_pos} to {to_pos}")
+                        else:
+                            print(f"Executing move: {piece.get_notation()} from {from_pos} to {to_pos}")
+                        if special_move == "en passant":
+                            print("En passant capture executed.")
+                        elif special_move == "promotion":
+                            print(f"Pawn promoted to {game.board[to_pos[0]][to_pos[1]].__class__.__name__}.\n")
+                        print("Move executed successfully!\n")
                         game.display()
                         break
                     except Exception as e:
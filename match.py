@@ -0,0 +1,302 @@
+import argparse
+import math
+import multiprocessing
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from board import Chess
+from ai import AI
+from rules import GameResult, game_result
+from pgn import write_game
+from batch import read_positions
+
+# Balanced openings used when no file is given; each is played twice with colours swapped
+OPENINGS = (
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+    'rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2',
+    'rnbqkbnr/pp1ppppp/8/2p5/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2',
+    'rnbqkbnr/ppp1pppp/8/3p4/3P4/8/PPP1PPPP/RNBQKBNR w KQkq - 0 2',
+    'rnbqkb1r/pppppppp/5n2/8/2P5/8/PP1PPPPP/RNBQKBNR w KQkq - 1 2',
+    'r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3',
+    'rnbqkbnr/pppp1ppp/4p3/8/3PP3/8/PPP2PPP/RNBQKBNR b KQkq - 0 2',
+    'rnbqkbnr/pp2pppp/2p5/3p4/3PP3/8/PPP2PPP/RNBQKBNR w KQkq - 0 3',
+)
+
+FEATURES = {'pvs': 'use_pvs', 'null': 'use_null_move', 'lmr': 'use_lmr', 'ext': 'use_check_extensions'}
+LIMITS = ('depth', 'movetime', 'nodes', 'hash')
+MAX_PLIES = 400  # Games still running after this many plies are adjudicated as draws
+
+
+def parse_engine(spec, default_name):
+    """
+    Parses an engine configuration such as 'name=new,depth=4,lmr=off' into a dictionary.
+    Keys: name, depth, movetime (ms per move), nodes (per move), hash (MB), and the features
+    pvs, null, lmr and ext, which take on/off.
+    """
+    config = {'name': default_name}
+    for item in filter(None, spec.split(',')):
+        key, _, value = item.partition('=')
+        key = key.strip()
+        value = value.strip()
+        if key == 'name':
+            config['name'] = value
+        elif key in LIMITS:
+            config[key] = int(value)
+        elif key in FEATURES:
+            if value not in ('on', 'off'):
+                raise ValueError(f"feature '{key}' takes on or off, not '{value}'")
+            config[key] = value == 'on'
+        else:
+            raise ValueError(f"unknown engine option '{key}'")
+    if not any(key in config for key in ('depth', 'movetime', 'nodes')):
+        config['depth'] = 3
+    return config
+
+
+def create_engine(config, game, color):
+    ai = AI(game, color, config.get('hash', 16))
+    for key, attribute in FEATURES.items():
+        if key in config:
+            setattr(ai, attribute, config[key])
+    return ai
+
+
+def play_game(round_number, fen, white, black, max_plies=MAX_PLIES):
+    """
+    Plays one game between two engine configurations; runs in a worker process.
+    Returns (result, termination, plies, PGN text), with the result from white's point of view.
+    """
+    game = Chess(fen)
+    engines = {1: create_engine(white, game, 1), -1: create_engine(black, game, -1)}
+    plies = 0
+    while True:
+        status = game_result(game)
+        if status == GameResult.CHECKMATE:
+            result, termination = ('0-1' if game.p_move == 1 else '1-0'), 'checkmate'
+            break
+        if status == GameResult.STALEMATE:
+            result, termination = '1/2-1/2', 'stalemate'
+            break
+        if status == GameResult.DRAW:
+            if game.repetitions() >= 2:
+                reason = 'threefold repetition'
+            elif game.halfmove_clock >= 100:
+                reason = 'fifty-move rule'
+            else:
+                reason = 'insufficient material'
+            result, termination = '1/2-1/2', reason
+            break
+        if plies >= max_plies:
+            result, termination = '1/2-1/2', 'adjudication'
+            break
+        engine = engines[game.p_move]
+        config = white if game.p_move == 1 else black
+        move = engine.find_best_move(config.get('depth'), config.get('movetime'), config.get('nodes'))
+        game.make_move(move)
+        plies += 1
+
+    headers = {
+        'Event': 'Goldfish match',
+        'Site': 'match.py',
+        'Round': str(round_number),
+        'White': white['name'],
+        'Black': black['name'],
+        'Result': result,
+        'Termination': termination,
+    }
+    return result, termination, plies, write_game(game, headers)
+
+
+def elo(score):
+    # Logistic Elo difference for an expected score strictly between 0 and 1
+    return -400 * math.log10(1 / score - 1)
+
+
+def expected_score(elo_difference):
+    return 1 / (1 + 10 ** (-elo_difference / 400))
+
+
+class MatchStats:
+    def __init__(self, elo0=0.0, elo1=5.0, alpha=0.05, beta=0.05):
+        """
+        Running result of a match from the first engine's point of view, with an SPRT of
+        H0: Elo difference = elo0 against H1: Elo difference = elo1.
+        """
+        self.wins = self.draws = self.losses = 0
+        self.elo0 = elo0
+        self.elo1 = elo1
+        self.lower_bound = math.log(beta / (1 - alpha))
+        self.upper_bound = math.log((1 - beta) / alpha)
+        self.terminations = Counter()
+
+    @property
+    def games(self):
+        return self.wins + self.draws + self.losses
+
+    def add(self, score, termination):
+        """
+        Records a game. score: 1, 0.5 or 0 for the first engine.
+        """
+        if score == 1:
+            self.wins += 1
+        elif score == 0:
+            self.losses += 1
+        else:
+            self.draws += 1
+        self.terminations[termination] += 1
+
+    def score(self):
+        return (self.wins + self.draws / 2) / self.games if self.games else 0.5
+
+    def variance(self):
+        # Per-game variance of the score, from the observed win/draw/loss frequencies
+        mean = self.score()
+        return (self.wins * (1 - mean) ** 2 + self.draws * (0.5 - mean) ** 2 + self.losses * mean ** 2) / self.games
+
+    def elo(self):
+        """
+        Returns the Elo difference and the half-width of its 95% confidence interval.
+        Both are infinite while one side has scored every point.
+        """
+        if not self.games:
+            return 0.0, math.inf
+        score = self.score()
+        if score <= 0 or score >= 1:
+            return (math.inf if score >= 1 else -math.inf), math.inf
+        margin = 1.96 * math.sqrt(self.variance() / self.games)
+        low = max(score - margin, 1e-6)
+        high = min(score + margin, 1 - 1e-6)
+        return elo(score), (elo(high) - elo(low)) / 2
+
+    def llr(self):
+        """
+        Log-likelihood ratio of H1 against H0, using the normal approximation of the score.
+        """
+        variance = self.variance() if self.games else 0.0
+        if variance == 0:
+            return 0.0
+        s0 = expected_score(self.elo0)
+        s1 = expected_score(self.elo1)
+        return self.games * (s1 - s0) * (2 * self.score() - s0 - s1) / (2 * variance)
+
+    def sprt(self):
+        """
+        Returns 'H1' (the first engine is stronger by elo1), 'H0' (it is not stronger than elo0),
+        or None while the test is still running.
+        """
+        llr = self.llr()
+        if llr >= self.upper_bound:
+            return 'H1'
+        if llr <= self.lower_bound:
+            return 'H0'
+        return None
+
+    def summary(self):
+        difference, margin = self.elo()
+        verdict = self.sprt()
+        return (f"{self.games} games: +{self.wins} ={self.draws} -{self.losses}, score {self.score():.1%}, "
+                f"Elo {difference:+.1f} +/- {margin:.1f}, LLR {self.llr():.2f} "
+                f"({self.lower_bound:.2f}, {self.upper_bound:.2f}) {verdict or 'running'}")
+
+
+def schedule(openings, games):
+    """
+    Yields (round, FEN, first engine plays white) for the requested number of games,
+    cycling through the openings and playing each with both colours.
+    """
+    for number in range(games):
+        yield number + 1, openings[(number // 2) % len(openings)], number % 2 == 0
+
+
+def run_match(engine1, engine2, openings, games, output=None, workers=1, stats=None, stop_on_sprt=False,
+              max_plies=MAX_PLIES, log=None):
+    """
+    Plays a match between two engine configurations and returns its MatchStats.
+    output: File the games are written to as PGN, in round order.
+    stop_on_sprt: Stop scheduling games once the SPRT has reached a verdict.
+    log: Optional callback, called with the MatchStats after every game.
+    """
+    if stats is None:
+        stats = MatchStats()
+
+    def record(pairing, outcome):
+        _, _, first_is_white = pairing
+        result, termination, _, text = outcome
+        score = {'1-0': 1.0, '0-1': 0.0}.get(result, 0.5)
+        stats.add(score if first_is_white else 1 - score, termination)
+        if output is not None:
+            output.write(text)
+        if log is not None:
+            log(stats)
+
+    def arguments(pairing):
+        round_number, fen, first_is_white = pairing
+        white, black = (engine1, engine2) if first_is_white else (engine2, engine1)
+        return round_number, fen, white, black, max_plies
+
+    pairings = schedule(openings, games)
+    if workers <= 1:
+        for pairing in pairings:
+            if stop_on_sprt and stats.sprt():
+                break
+            record(pairing, play_game(*arguments(pairing)))
+        return stats
+
+    pending = deque()
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        for pairing in pairings:
+            if stop_on_sprt and stats.sprt():
+                break
+            pending.append((pairing, executor.submit(play_game, *arguments(pairing))))
+            if len(pending) >= 2 * workers:
+                # Games are recorded in round order, so the PGN file follows the schedule
+                pairing, future = pending.popleft()
+                record(pairing, future.result())
+        while pending:
+            pairing, future = pending.popleft()
+            record(pairing, future.result())
+    return stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Play two engine configurations against each other and report Elo and SPRT.')
+    parser.add_argument('engine1', help="Configuration under test, e.g. 'name=new,depth=4'")
+    parser.add_argument('engine2', help="Baseline configuration, e.g. 'name=old,depth=4,lmr=off'")
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--openings', help='EPD/FEN file of opening positions')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--pgn', help='Append the games to this PGN file')
+    parser.add_argument('--max-plies', type=int, default=MAX_PLIES)
+    parser.add_argument('--elo0', type=float, default=0.0)
+    parser.add_argument('--elo1', type=float, default=5.0)
+    parser.add_argument('--alpha', type=float, default=0.05)
+    parser.add_argument('--beta', type=float, default=0.05)
+    parser.add_argument('--sprt', action='store_true', help='Stop once the SPRT reaches a verdict')
+    args = parser.parse_args()
+
+    try:
+        engine1 = parse_engine(args.engine1, 'engine1')
+        engine2 = parse_engine(args.engine2, 'engine2')
+    except ValueError as error:
+        parser.error(str(error))
+    if args.openings:
+        with open(args.openings) as source:
+            openings = [fen for _, fen, _ in read_positions(source)]
+    else:
+        openings = OPENINGS
+
+    stats = MatchStats(args.elo0, args.elo1, args.alpha, args.beta)
+    output = open(args.pgn, 'a') if args.pgn else None
+    start = time.perf_counter()
+    try:
+        run_match(engine1, engine2, openings, args.games, output, args.workers, stats, args.sprt, args.max_plies,
+                  log=lambda stats: print(stats.summary(), file=sys.stderr))
+    finally:
+        if output is not None:
+            output.close()
+    elapsed = time.perf_counter() - start
+    print(f"{engine1['name']} vs {engine2['name']}: {stats.summary()}")
+    print('Terminations: ' + ', '.join(f'{name} {count}' for name, count in stats.terminations.most_common()))
+    print(f"{elapsed:.1f}s, {stats.games / elapsed * 3600:.0f} games/hour")
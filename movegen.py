@@ -0,0 +1,257 @@
+from pieces import Pawn, King, KNIGHT_STEPS, KING_STEPS, DIAGONALS, STRAIGHTS
+from moves import pack_target, SQUARE_POS
+
+# Each ray direction with the slider (other than the queen) that moves along it
+RAYS = tuple((direction, 3) for direction in DIAGONALS) + tuple((direction, 4) for direction in STRAIGHTS)
+
+# Squares the king crosses (and must not be attacked on) for each castling destination
+CASTLING_PATHS = {
+    (7, 6): ((7, 5), (7, 6)), (7, 2): ((7, 3), (7, 2)),
+    (0, 6): ((0, 5), (0, 6)), (0, 2): ((0, 3), (0, 2))
+}
+
+
+def is_square_attacked(game, pos, color):
+    """
+    Checks whether the pieces of the given color attack a square, looking outward from the square
+    instead of generating the attacker's moves.
+    """
+    board = game.board
+    r, c = pos
+    # White pawns capture towards row 0, so an attacking white pawn sits one row below the square
+    pr = r + 1 if color == 1 else r - 1
+    if 0 <= pr < 8:
+        for pc in (c - 1, c + 1):
+            if 0 <= pc < 8:
+                p = board[pr][pc]
+                if p != 0 and p.color == color and p.value == 1:
+                    return True
+    for dr, dc in KNIGHT_STEPS:
+        y, x = r + dr, c + dc
+        if 0 <= y < 8 and 0 <= x < 8:
+            p = board[y][x]
+            if p != 0 and p.color == color and p.value == 2:
+                return True
+    for dr, dc in KING_STEPS:
+        y, x = r + dr, c + dc
+        if 0 <= y < 8 and 0 <= x < 8:
+            p = board[y][x]
+            if p != 0 and p.color == color and p.value == 6:
+                return True
+    for (dr, dc), slider in RAYS:
+        y, x = r + dr, c + dc
+        while 0 <= y < 8 and 0 <= x < 8:
+            p = board[y][x]
+            if p != 0:
+                if p.color == color and (p.value == slider or p.value == 5):
+                    return True
+                break
+            y, x = y + dr, x + dc
+    return False
+
+
+def checkers_and_pins(game, player):
+    """
+    Finds the enemy pieces giving check to the player's king and the player's pieces pinned to it.
+    Returns a list of (checker_pos, squares) pairs, where squares are the checker square and the squares
+    a piece can interpose on, and a dictionary mapping each pinned position to its pin direction.
+    """
+    board = game.board
+    kr, kc = game.kings[player]
+    checkers = []
+    pins = {}
+    for (dr, dc), slider in RAYS:
+        y, x = kr + dr, kc + dc
+        shield = None
+        path = []
+        while 0 <= y < 8 and 0 <= x < 8:
+            p = board[y][x]
+            if p != 0:
+                if p.color == player:
+                    if shield is not None:
+                        break
+                    shield = (y, x)
+                else:
+                    if p.value == slider or p.value == 5:
+                        if shield is None:
+                            path.append((y, x))
+                            checkers.append(((y, x), set(path)))
+                        else:
+                            pins[shield] = (dr, dc)
+                    break
+            elif shield is None:
+                path.append((y, x))
+            y, x = y + dr, x + dc
+    for dr, dc in KNIGHT_STEPS:
+        y, x = kr + dr, kc + dc
+        if 0 <= y < 8 and 0 <= x < 8:
+            p = board[y][x]
+            if p != 0 and p.color != player and p.value == 2:
+                checkers.append(((y, x), {(y, x)}))
+    # Enemy pawns attack the king from the row in front of it
+    pr = kr - 1 if player == 1 else kr + 1
+    if 0 <= pr < 8:
+        for pc in (kc - 1, kc + 1):
+            if 0 <= pc < 8:
+                p = board[pr][pc]
+                if p != 0 and p.color != player and p.value == 1:
+                    checkers.append(((pr, pc), {(pr, pc)}))
+    return checkers, pins
+
+
+def castling_moves(game, player):
+    """
+    Generates the legal castling moves of the player as (from_pos, to_pos) pairs.
+    """
+    king_pos = game.kings[player]
+    if king_pos is None or is_square_attacked(game, king_pos, -player):
+        return []
+    return [(from_pos, to_pos) for from_pos, to_pos in game.get_castling_moves(player)
+            if not any(is_square_attacked(game, square, -player) for square in CASTLING_PATHS[to_pos])]
+
+
+def legal_moves(game, player, from_pos=None, packed=False):
+    """
+    Generates the legal moves of the player in the (piece, from_pos, (from_pos, to_pos)) form of Chess.get_legal_moves.
+    Checkers and pinned pieces are computed once, so moves are filtered without playing them;
+    only king moves and en passant captures need an attack test.
+    from_pos: Only generate the moves of the piece on this square.
+    packed: Generate packed integer moves (see moves.py) instead.
+    """
+    board = game.board
+    en_passant = game.en_passant
+    king_pos = game.kings[player]
+    if king_pos is None:
+        checkers, pins = [], {}
+    else:
+        checkers, pins = checkers_and_pins(game, player)
+        kr, kc = king_pos
+    evasions = checkers[0][1] if len(checkers) == 1 else None
+    moves = []
+    for y, row in enumerate(board):
+        for x, piece in enumerate(row):
+            if piece == 0 or piece.color != player:
+                continue
+            pos = (y, x)
+            if from_pos is not None and pos != from_pos:
+                continue
+            if isinstance(piece, King):
+                row[x] = 0  # Lift the king so sliders attack through its square
+                for target in piece.movement(player, pos):
+                    if not is_square_attacked(game, target[1], -player):
+                        moves.append(pack_target(board, piece, target, en_passant) if packed else (piece, pos, target))
+                row[x] = piece
+                continue
+            if len(checkers) > 1:
+                continue  # Only the king can answer a double check
+            pin = pins.get(pos)
+            for target in piece.movement(player, pos):
+                to_pos = target[1]
+                if pin is not None and (to_pos[0] - kr) * pin[1] != (to_pos[1] - kc) * pin[0]:
+                    continue  # A pinned piece may only move along the pin line
+                if to_pos == game.en_passant and isinstance(piece, Pawn) and to_pos[1] != x:
+                    # En passant removes two pieces from the king's lines, so test it by playing it
+                    game.make_move((piece, pos, to_pos))
+                    safe = not is_square_attacked(game, king_pos, -player)
+                    game.unmake_move()
+                    if safe:
+                        moves.append(pack_target(board, piece, target, en_passant) if packed else (piece, pos, target))
+                    continue
+                if evasions is not None and to_pos not in evasions:
+                    continue
+                moves.append(pack_target(board, piece, target, en_passant) if packed else (piece, pos, target))
+    if player == game.p_move and not checkers and (from_pos is None or from_pos == king_pos):
+        king = board[king_pos[0]][king_pos[1]]
+        if packed:
+            moves.extend(pack_target(board, king, target, None) for target in castling_moves(game, player))
+        else:
+            moves.extend((king, start, (start, end)) for start, end in castling_moves(game, player))
+    return moves
+
+
+# Piece values used by the static exchange evaluation, indexed by Piece.value
+SEE_VALUES = (0, 100, 320, 330, 500, 900, 20000)
+
+
+def least_valuable_attacker(game, pos, color):
+    """
+    Finds the cheapest piece of the given color attacking a square, looking outward like is_square_attacked.
+    Returns its position, or None. Pins are ignored.
+    """
+    board = game.board
+    r, c = pos
+    pr = r + 1 if color == 1 else r - 1
+    if 0 <= pr < 8:
+        for pc in (c - 1, c + 1):
+            if 0 <= pc < 8:
+                p = board[pr][pc]
+                if p != 0 and p.color == color and p.value == 1:
+                    return pr, pc
+    for dr, dc in KNIGHT_STEPS:
+        y, x = r + dr, c + dc
+        if 0 <= y < 8 and 0 <= x < 8:
+            p = board[y][x]
+            if p != 0 and p.color == color and p.value == 2:
+                return y, x
+    best = None
+    best_value = 7
+    for (dr, dc), slider in RAYS:
+        y, x = r + dr, c + dc
+        while 0 <= y < 8 and 0 <= x < 8:
+            p = board[y][x]
+            if p != 0:
+                if p.color == color and (p.value == slider or p.value == 5) and p.value < best_value:
+                    best, best_value = (y, x), p.value
+                break
+            y, x = y + dr, x + dc
+    if best is not None:
+        return best
+    for dr, dc in KING_STEPS:
+        y, x = r + dr, c + dc
+        if 0 <= y < 8 and 0 <= x < 8:
+            p = board[y][x]
+            if p != 0 and p.color == color and p.value == 6:
+                return y, x
+    return None
+
+
+def see(game, move):
+    """
+    Static exchange evaluation: the material balance, from the mover's side, of the capture sequence
+    on the destination square when both sides always recapture with their cheapest attacker.
+    Pieces are lifted off the board while the exchange is resolved, so sliders behind them (x-rays) join in.
+    move: A packed move (see moves.py).
+    """
+    board = game.board
+    from_pos, to_pos = SQUARE_POS[move & 63], SQUARE_POS[move >> 6 & 63]
+    piece = board[from_pos[0]][from_pos[1]]
+    victim = board[to_pos[0]][to_pos[1]]
+    gains = [SEE_VALUES[victim.value] if victim != 0 else SEE_VALUES[1]]  # An empty target is en passant
+    on_square = SEE_VALUES[piece.value]
+    lifted = [(from_pos, piece)]
+    board[from_pos[0]][from_pos[1]] = 0
+    side = -piece.color
+    while True:
+        pos = least_valuable_attacker(game, to_pos, side)
+        if pos is None:
+            break
+        attacker = board[pos[0]][pos[1]]
+        if attacker.value == 6:
+            # The king may only recapture when the square is no longer defended
+            board[pos[0]][pos[1]] = 0
+            defended = least_valuable_attacker(game, to_pos, -side) is not None
+            board[pos[0]][pos[1]] = attacker
+            if defended:
+                break
+        gains.append(on_square - gains[-1])
+        on_square = SEE_VALUES[attacker.value]
+        lifted.append((pos, attacker))
+        board[pos[0]][pos[1]] = 0
+        side = -side
+    for (y, x), p in lifted:
+        board[y][x] = p
+    # Either side may stop recapturing when continuing would lose material
+    while len(gains) > 1:
+        last = gains.pop()
+        gains[-1] = -max(-gains[-1], last)
+    return gains[0]
@@ -0,0 +1,112 @@
+# Packed moves, used by every board core: from | to << 6 | flags << 12, with squares numbered
+# a1 = 0 ... h8 = 63. Flags: 0 quiet, 1 double push, 2/3 king/queen side castling, 4 capture, 5 en passant,
+# 8-11 promotion to N, B, R, Q, plus 4 for promotion captures. No legal move packs to 0, which stands for "no move".
+QUIET, DOUBLE_PUSH, KING_CASTLE, QUEEN_CASTLE, CAPTURE, EN_PASSANT = 0, 1, 2, 3, 4, 5
+PROMOTION = 8
+NULL_MOVE = 0
+PROMOTION_NOTATIONS = 'NBRQ'
+PROMOTION_FLAGS = {notation: PROMOTION | index for index, notation in enumerate(PROMOTION_NOTATIONS)}
+CAPTURE_BIT = CAPTURE << 12  # Flag bits in place, for testing a packed move without shifting it
+PROMOTION_BIT = PROMOTION << 12
+
+# (row, column) position of the Chess board matrix for each square, shared so decoding allocates nothing
+SQUARE_POS = tuple((7 - (square >> 3), square & 7) for square in range(64))
+FILES = 'abcdefgh'
+
+
+def square(pos):
+    """
+    Converts a (row, column) position to a square number.
+    """
+    return (7 - pos[0]) << 3 | pos[1]
+
+
+def pack(from_square, to_square, flags=QUIET):
+    return from_square | to_square << 6 | flags << 12
+
+
+def from_pos(move):
+    return SQUARE_POS[move & 63]
+
+
+def to_pos(move):
+    return SQUARE_POS[move >> 6 & 63]
+
+
+def is_capture(move):
+    # En passant and promotion captures carry the capture bit as well
+    return move & CAPTURE_BIT != 0
+
+
+def is_promotion(move):
+    return move & PROMOTION_BIT != 0
+
+
+def promotion(move):
+    """
+    Returns the promotion notation ('N', 'B', 'R' or 'Q') of a move, or None.
+    """
+    return PROMOTION_NOTATIONS[move >> 12 & 3] if move >> 12 & PROMOTION else None
+
+
+def pack_target(board, piece, target, en_passant):
+    """
+    Packs a (from_pos, to_pos[, promotion]) target of Piece.movement for a piece on the board, working out
+    the flags from the board before the move. Used by move generation, so it allocates nothing.
+    """
+    (fr, fc), (tr, tc) = target[0], target[1]
+    move = (7 - fr) << 3 | fc | ((7 - tr) << 3 | tc) << 6
+    flags = QUIET if board[tr][tc] == 0 else CAPTURE
+    value = piece.value
+    if value == 1:
+        if tr == 0 or tr == 7:
+            flags |= PROMOTION_FLAGS[target[2] if len(target) > 2 else 'Q']
+        elif fc != tc and flags == QUIET and target[1] == en_passant:
+            flags = EN_PASSANT
+        elif tr - fr == 2 or fr - tr == 2:
+            flags = DOUBLE_PUSH
+    elif value == 6 and (tc - fc == 2 or fc - tc == 2):
+        flags = KING_CASTLE if tc == 6 else QUEEN_CASTLE
+    return move | flags << 12
+
+
+def encode(game, move):
+    """
+    Packs a move in the (piece, from_pos, to_pos[, promotion]) form taken by Chess.make_move, for the current position.
+    """
+    board = game.board
+    start = move[1]
+    return pack_target(board, board[start[0]][start[1]], (start,) + tuple(move[2:]), game.en_passant)
+
+
+def decode(game, move):
+    """
+    Unpacks a move into the (piece, from_pos, to_pos[, promotion]) form for the current position.
+    """
+    start = SQUARE_POS[move & 63]
+    piece = game.board[start[0]][start[1]]
+    if move >> 12 & PROMOTION:
+        return piece, start, SQUARE_POS[move >> 6 & 63], PROMOTION_NOTATIONS[move >> 12 & 3]
+    return piece, start, SQUARE_POS[move >> 6 & 63]
+
+
+def to_uci(move):
+    """
+    Writes a packed move as a UCI string (e.g. 'e2e4', 'e7e8q'); the null move is '0000'.
+    """
+    if move == NULL_MOVE:
+        return '0000'
+    frm, to = move & 63, move >> 6 & 63
+    name = f'{FILES[frm & 7]}{(frm >> 3) + 1}{FILES[to & 7]}{(to >> 3) + 1}'
+    return name + PROMOTION_NOTATIONS[move >> 12 & 3].lower() if move >> 12 & PROMOTION else name
+
+
+def from_uci(game, text):
+    """
+    Finds the legal packed move of the side to move written as a UCI string, or None if there is none.
+    """
+    text = text.lower()
+    for move in game.generate_moves(game.p_move):
+        if to_uci(move) == text:
+            return move
+    return None
@@ -0,0 +1,108 @@
+from moves import SQUARE_POS, CAPTURE_BIT, PROMOTION_BIT
+
+# Ordering stages, in the order moves are searched
+HASH_MOVE, CAPTURE, KILLER, QUIET = 0, 1, 2, 3
+STAGE_NAMES = ('hash', 'capture', 'killer', 'quiet')
+
+MAX_PLY = 128
+CUTOFF_INDEXES = 16  # Cutoffs are counted by move index; the last counter collects all later moves
+
+
+class MoveOrderer:
+    def __init__(self):
+        """
+        Orders moves between generation and search: hash move, MVV-LVA captures, killers, then history.
+        """
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = {}  # color * (from | to << 6) of a packed move -> score of quiet moves that caused cutoffs
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.searched = [0, 0, 0, 0]  # Moves searched per stage
+        self.cutoffs = [0, 0, 0, 0]  # Beta cutoffs per stage
+        self.first_move_cutoffs = 0  # Cutoffs caused by the first move searched
+        self.cut_nodes = 0
+        self.cutoff_indexes = [0] * CUTOFF_INDEXES
+
+    def new_search(self):
+        """
+        Clears the killers and ages the history scores before a new search.
+        """
+        for killers in self.killers:
+            killers[0] = killers[1] = None
+        for key in self.history:
+            self.history[key] >>= 1
+
+    def mvv_lva(self, game, move):
+        """
+        Most valuable victim first, then least valuable attacker, using Piece.value.
+        Promotions are scored as winning a queen.
+        move: A packed capture or promotion.
+        """
+        board = game.board
+        from_pos, to_pos = SQUARE_POS[move & 63], SQUARE_POS[move >> 6 & 63]
+        victim = board[to_pos[0]][to_pos[1]]
+        score = victim.value * 8 if victim != 0 else 8 if move & CAPTURE_BIT else 0  # En passant takes a pawn
+        if move & PROMOTION_BIT and move >> 12 & 3 == 3:
+            score += 5 * 8
+        return score - board[from_pos[0]][from_pos[1]].value
+
+    def order(self, game, moves, ply, hash_move=None):
+        """
+        Returns the moves as (stage, move) pairs in search order.
+        moves: Packed moves of the side to move (see moves.py).
+        """
+        killers = self.killers[ply] if ply < MAX_PLY else (None, None)
+        history = self.history
+        color = game.p_move
+        ordered = []
+        captures = []
+        killer_moves = []
+        quiets = []
+        for move in moves:
+            if move == hash_move:
+                ordered.append((HASH_MOVE, move))
+            elif move & (CAPTURE_BIT | PROMOTION_BIT):
+                captures.append((self.mvv_lva(game, move), move))
+            elif move == killers[0] or move == killers[1]:
+                killer_moves.append((0 if move == killers[0] else 1, move))
+            else:
+                quiets.append((history.get(color * (move & 0xFFF), 0), move))
+        captures.sort(key=lambda scored: scored[0], reverse=True)
+        killer_moves.sort(key=lambda scored: scored[0])
+        quiets.sort(key=lambda scored: scored[0], reverse=True)
+        ordered.extend((CAPTURE, move) for _, move in captures)
+        ordered.extend((KILLER, move) for _, move in killer_moves)
+        ordered.extend((QUIET, move) for _, move in quiets)
+        return ordered
+
+    def record_cutoff(self, move, stage, index, depth, ply, color):
+        """
+        Updates killers, history and statistics after a move caused a beta cutoff.
+        index: Position of the move in the ordered list.
+        color: The side that played the move.
+        """
+        self.cutoffs[stage] += 1
+        self.cut_nodes += 1
+        self.cutoff_indexes[min(index, CUTOFF_INDEXES - 1)] += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+        if stage == QUIET or stage == KILLER:
+            killers = self.killers[ply] if ply < MAX_PLY else None
+            if killers is not None and move != killers[0]:
+                killers[1] = killers[0]
+                killers[0] = move
+            key = color * (move & 0xFFF)
+            self.history[key] = self.history.get(key, 0) + depth * depth
+
+    def stats(self):
+        """
+        Returns the per-stage search and cutoff counters as a dictionary.
+        """
+        return {
+            'searched': dict(zip(STAGE_NAMES, self.searched)),
+            'cutoffs': dict(zip(STAGE_NAMES, self.cutoffs)),
+            'cutoff_rate': {name: self.cutoffs[i] / self.searched[i] if self.searched[i] else 0.0
+                            for i, name in enumerate(STAGE_NAMES)},
+            'first_move_cutoff_rate': self.first_move_cutoffs / self.cut_nodes if self.cut_nodes else 0.0,
+        }
@@ -0,0 +1,278 @@
+import argparse
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from board import Chess
+from ai import AI, INFINITY
+from tablebase import Tablebase
+from moves import encode
+
+SEARCH_COUNTERS = ('null_cutoffs', 'lmr_researches', 'pvs_researches', 'extensions')
+
+
+class SharedBound:
+    def __init__(self, manager):
+        """
+        Best root score proven so far at each depth, from the side to move's point of view, shared by the
+        processes of a root split so each can search its moves against the others' results.
+        """
+        self.values = manager.dict()
+        self.lock = manager.Lock()
+
+    def get(self, depth):
+        return self.values.get(depth, -INFINITY)
+
+    def update(self, depth, value):
+        with self.lock:
+            if value > self.values.get(depth, -INFINITY):
+                self.values[depth] = value
+
+    def clear(self):
+        self.values.clear()
+
+
+def search_worker(fen, history, moves, depth, movetime_ms, max_nodes, hash_mb, stop_event=None, tablebase_path=None,
+                  progress=None, worker=0, shared_bound=None):
+    """
+    Runs in a worker process: loads the position from its FEN string and searches only the given root moves.
+    Moves travel as packed integers, so no Chess object is pickled in either direction.
+    history: Zobrist keys of the positions since the last capture or pawn move, ending with the current one,
+             so repetitions of earlier positions are seen by the search.
+    shared_bound: Optional SharedBound of the root split.
+    progress: Optional queue receiving (worker, depth, best move, value, principal variation, nodes,
+              quiescence nodes, selective depth) after every completed iteration.
+    Returns a dictionary with the (depth, best move, value, principal variation, nodes, quiescence nodes,
+    selective depth) of every completed iteration, whether the search was stopped, and the counters
+    merged into the parent's statistics.
+    """
+    game = Chess(fen)
+    game.history = list(history)
+    ai = AI(game, game.p_move, hash_mb, tablebase=Tablebase(tablebase_path) if tablebase_path else None)
+    ai.stop_event = stop_event
+    ai.shared_bound = shared_bound
+    iterations = []
+
+    def report(ai):
+        iterations.append((ai.completed_depth, ai.pv[0], ai.best_value, ai.pv, ai.nodes, ai.qnodes, ai.seldepth))
+        if progress is not None:
+            progress.put((worker,) + iterations[-1])
+
+    ai.on_iteration = report
+    ai.find_best_move(depth, movetime_ms, max_nodes, moves)
+    orderer = ai.orderer
+    return {
+        'iterations': iterations,
+        'stopped': ai.stopped,
+        'nodes': ai.nodes,
+        'qnodes': ai.qnodes,
+        'seldepth': ai.seldepth,
+        'iteration_nodes': ai.iteration_nodes,
+        'counters': {name: getattr(ai, name) for name in SEARCH_COUNTERS},
+        'tt': (ai.tt.hits, ai.tt.misses),
+        'orderer': (orderer.searched, orderer.cutoffs, orderer.cutoff_indexes, orderer.first_move_cutoffs, orderer.cut_nodes),
+    }
+
+
+class ParallelAI(AI):
+    def __init__(self, game, color, hash_mb=16, workers=None, book=None, tablebase=None):
+        """
+        AI whose search splits the root moves across a pool of worker processes.
+        Threads would not help: the search is pure Python and holds the GIL.
+        workers: Number of processes; defaults to the number of CPUs.
+        """
+        super().__init__(game, color, hash_mb, book, tablebase)
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = None
+        self.manager = None
+        self.worker_stop = None  # Shared event forwarding stop_event to the workers
+        self.progress = None  # Shared queue of the workers' completed iterations, when on_iteration is set
+        self.bound = None  # SharedBound of the workers
+
+    def iterative_deepening(self, depth, movetime_ms, max_nodes, moves):
+        """
+        Searches the current position in parallel and returns the best move for the AI; called by find_best_move.
+        The ordered root moves are dealt round-robin to the workers, so each gets a share of the
+        promising moves; every worker runs its own iterative deepening over its share, against the best
+        root score the others have proven at the same depth.
+        Results are merged deterministically at the shallowest depth completed by every worker:
+        best value, ties going to the move ordered first.
+        With on_iteration set, the workers report every completed iteration, and on_iteration is called
+        whenever all of them have completed a new depth.
+        """
+        game = self.game
+        root_moves = game.generate_moves(self.color)
+        if moves is not None:
+            wanted = {move if isinstance(move, int) else encode(game, move) for move in moves}
+            root_moves = [move for move in root_moves if move in wanted]
+        self.nodes = 0
+        self.qnodes = 0
+        self.seldepth = 0
+        self.pv = []
+        self.best_value = None
+        self.completed_depth = 0
+        self.reset_stats()
+        self.orderer.reset_stats()
+        if not root_moves:
+            return None
+        if moves is None and (self.book_move() is not None or self.tablebase_move() is not None):
+            return self.pv[0]
+        root_moves = [move for _, move in self.orderer.order(game, root_moves, 0)]
+        workers = min(self.workers, len(root_moves))
+        if workers == 1:
+            return super().iterative_deepening(depth, movetime_ms, max_nodes, root_moves)
+
+        # Workers are spawned rather than forked: forking from a search thread can copy locks
+        # held by other threads (such as a UCI loop blocked reading stdin) into the child
+        context = multiprocessing.get_context('spawn')
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.workers, mp_context=context)
+        if self.manager is None:
+            self.manager = context.Manager()
+            self.bound = SharedBound(self.manager)
+        self.bound.clear()
+        if self.stop_event is not None and self.worker_stop is None:
+            self.worker_stop = self.manager.Event()
+        if self.worker_stop is not None:
+            self.worker_stop.clear()
+        if self.on_iteration is not None and self.progress is None:
+            self.progress = self.manager.Queue()
+        progress = self.progress if self.on_iteration is not None else None
+        fen = game.to_fen()
+        history = game.history[-1 - min(game.halfmove_clock, len(game.history) - 1):]  # Positions that can recur
+        worker_nodes = max_nodes // workers if max_nodes else None
+        futures = [self.executor.submit(search_worker, fen, history, root_moves[i::workers], depth, movetime_ms,
+                                        worker_nodes, self.tt.size_mb, self.worker_stop,
+                                        self.tablebase and self.tablebase.directory, progress, i, self.bound)
+                   for i in range(workers)]
+        iterations = [[] for _ in range(workers)]  # Iteration reports of each worker, by depth
+        while wait(futures, timeout=0.05)[1]:
+            if self.stop_event is not None and self.stop_event.is_set():
+                self.worker_stop.set()
+            if progress is not None:
+                self.report_progress(progress, iterations, root_moves)
+        results = [future.result() for future in futures]
+        if progress is not None:
+            self.report_progress(progress, iterations, root_moves)
+
+        # Results are compared at a common depth: the shallowest depth reached by a worker that was stopped.
+        # A worker that finished by itself (depth limit or a forced mate) keeps its last result at any depth
+        reported_depth = self.completed_depth
+        completed = [result for result in results if result['iterations']]
+        stopped = [result['iterations'][-1][0] for result in completed if result['stopped']]
+        self.completed_depth = min(stopped) if stopped else max((result['iterations'][-1][0] for result in completed), default=0)
+        self.collect_stats(results)
+        if not completed:
+            return root_moves[0]  # Stopped before any worker completed an iteration
+        candidates = [result['iterations'][min(self.completed_depth, len(result['iterations'])) - 1][1:4]
+                      for result in completed]
+        _, self.best_value, self.pv = self.merge(candidates, root_moves)
+        if self.on_iteration is not None and self.completed_depth > reported_depth:
+            self.on_iteration(self)
+        return self.pv[0]
+
+    def collect_stats(self, results):
+        """
+        Adds up the workers' counters, so nodes, quiescence nodes, selective depth, the transposition table
+        hit rate and the move ordering statistics describe the whole parallel search.
+        """
+        self.nodes = sum(result['nodes'] for result in results)
+        self.qnodes = sum(result['qnodes'] for result in results)
+        self.seldepth = max(result['seldepth'] for result in results)
+        for name in SEARCH_COUNTERS:
+            setattr(self, name, sum(result['counters'][name] for result in results))
+        self.iteration_nodes = [sum(result['iteration_nodes'][i] for result in results if i < len(result['iteration_nodes']))
+                                for i in range(self.completed_depth)]
+        # The parent's own table is not probed; the workers' probes are counted on it instead
+        for result in results:
+            hits, misses = result['tt']
+            self.tt.hits += hits
+            self.tt.misses += misses
+            searched, cutoffs, cutoff_indexes, first_move_cutoffs, cut_nodes = result['orderer']
+            orderer = self.orderer
+            for counts, worker_counts in ((orderer.searched, searched), (orderer.cutoffs, cutoffs),
+                                          (orderer.cutoff_indexes, cutoff_indexes)):
+                for i, count in enumerate(worker_counts):
+                    counts[i] += count
+            orderer.first_move_cutoffs += first_move_cutoffs
+            orderer.cut_nodes += cut_nodes
+
+    def merge(self, candidates, root_moves):
+        """
+        Picks the best of the workers' (move, value, principal variation) results: the best value
+        for the AI, ties going to the move ordered first.
+        """
+        is_maximizing = self.color == 1
+        best = None
+        for candidate in candidates:
+            move, value, _ = candidate
+            if best is None or (value > best[1] if is_maximizing else value < best[1]) or \
+                    (value == best[1] and root_moves.index(move) < root_moves.index(best[0])):
+                best = candidate
+        return best
+
+    def report_progress(self, progress, iterations, root_moves):
+        """
+        Collects the iterations reported by the workers and calls on_iteration with the merged result
+        for every depth that all the workers have completed since the last report.
+        """
+        while True:
+            try:
+                report = progress.get_nowait()
+            except queue.Empty:
+                break
+            iterations[report[0]].append(report[1:])
+        if not all(iterations):
+            return
+        for depth in range(self.completed_depth + 1, min(reports[-1][0] for reports in iterations) + 1):
+            _, self.best_value, self.pv = self.merge([reports[depth - 1][1:4] for reports in iterations], root_moves)
+            self.completed_depth = depth
+            self.nodes = sum(reports[depth - 1][4] for reports in iterations)
+            self.qnodes = sum(reports[depth - 1][5] for reports in iterations)
+            self.seldepth = max(reports[depth - 1][6] for reports in iterations)
+            self.on_iteration(self)
+
+    def close(self):
+        """
+        Shuts the worker processes down.
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        if self.manager is not None:
+            self.manager.shutdown()
+            self.manager = self.worker_stop = self.progress = self.bound = None
+
+
+def benchmark(EPD, depth, workers):
+    """
+    Searches a position to a fixed depth on one core and in parallel, and reports the speedup.
+    """
+    game = Chess(EPD)
+    ai = AI(game, game.p_move)
+    start = time.perf_counter()
+    move = ai.find_best_move(depth)
+    single = time.perf_counter() - start
+    print(f"1 process:  {Chess.move_to_uci(move)} ({ai.best_value}) {ai.nodes} nodes in {single:.2f}s")
+
+    parallel_ai = ParallelAI(game, game.p_move, workers=workers)
+    try:
+        parallel_ai.find_best_move(1)  # Start the worker processes outside the timing
+        start = time.perf_counter()
+        move = parallel_ai.find_best_move(depth)
+        elapsed = time.perf_counter() - start
+    finally:
+        parallel_ai.close()
+    print(f"{parallel_ai.workers} processes: {Chess.move_to_uci(move)} ({parallel_ai.best_value}) {parallel_ai.nodes} nodes in {elapsed:.2f}s")
+    print(f"Speedup: {single / elapsed:.2f}x")
+    return single / elapsed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare single-process and parallel root search.')
+    parser.add_argument('--epd', default='r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq -')
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    benchmark(args.epd, args.depth, args.workers)
@@ -0,0 +1,101 @@
+import sys
+import time
+from board import BACKENDS
+
+# Reference positions with their known perft node counts by depth
+POSITIONS = [
+    ("start", 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq -',
+     {1: 20, 2: 400, 3: 8902, 4: 197281, 5: 4865609}),
+    ("kiwipete", 'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq -',
+     {1: 48, 2: 2039, 3: 97862, 4: 4085603}),
+    ("en passant and pins", '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - -',
+     {1: 14, 2: 191, 3: 2812, 4: 43238, 5: 674624}),
+    ("promotions and castling", 'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq -',
+     {1: 6, 2: 264, 3: 9467, 4: 422333}),
+    ("promotion with capture", 'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ -',
+     {1: 44, 2: 1486, 3: 62379, 4: 2103487}),
+]
+
+def perft(game, depth):
+    """
+    Counts the leaf nodes of the legal move tree to the given depth, using get_legal_moves and make/unmake.
+    """
+    moves = game.get_legal_moves(game.p_move)
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+    nodes = 0
+    for piece, start_pos, end_pos in moves:
+        game.make_move((piece, start_pos) + end_pos[1:])
+        nodes += perft(game, depth - 1)
+        game.unmake_move()
+    return nodes
+
+
+def move_name(start_pos, end_pos):
+    """
+    Writes a move in coordinate notation (e.g. 'e2e4', 'e7e8q').
+    """
+    name = ''.join('abcdefgh'[col] + str(8 - row) for row, col in (start_pos, end_pos[1]))
+    return name + end_pos[2].lower() if len(end_pos) > 2 else name
+
+
+def divide(game, depth):
+    """
+    Returns the perft count below each root move, keyed by the move in coordinate notation.
+    """
+    result = {}
+    for piece, start_pos, end_pos in game.get_legal_moves(game.p_move):
+        game.make_move((piece, start_pos) + end_pos[1:])
+        result[move_name(start_pos, end_pos)] = perft(game, depth - 1)
+        game.unmake_move()
+    return result
+
+
+def run(EPD, max_depth, backend='objects', expected=None, out=sys.stdout):
+    """
+    Runs perft for every depth up to max_depth, reporting nodes, time and nodes per second.
+    Returns True if every count matches the expected ones.
+    """
+    game = BACKENDS[backend](EPD)
+    ok = True
+    for depth in range(1, max_depth + 1):
+        start = time.perf_counter()
+        nodes = perft(game, depth)
+        elapsed = time.perf_counter() - start
+        nps = nodes / elapsed if elapsed > 0 else 0
+        status = ''
+        if expected and depth in expected:
+            status = 'ok' if nodes == expected[depth] else f'FAIL (expected {expected[depth]})'
+            ok = ok and nodes == expected[depth]
+        out.write(f"depth {depth:2d}  nodes {nodes:10d}  time {elapsed:8.3f}s  nps {nps:10.0f}  {status}\n")
+    return ok
+
+
+def main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description="Move generator node counts and speed.")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='objects')
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--epd', help="Position to count instead of the reference suite")
+    parser.add_argument('--divide', action='store_true', help="Print the count below each root move")
+    args = parser.parse_args(argv)
+
+    if args.epd:
+        if args.divide:
+            counts = divide(BACKENDS[args.backend](args.epd), args.depth)
+            for name in sorted(counts):
+                print(f"{name}: {counts[name]}")
+            print(f"Total: {sum(counts.values())}")
+            return 0
+        run(args.epd, args.depth, args.backend)
+        return 0
+
+    ok = True
+    for name, EPD, counts in POSITIONS:
+        print(f"{name}: {EPD}")
+        ok = run(EPD, min(args.depth, max(counts)), args.backend, counts) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
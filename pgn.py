@@ -0,0 +1,244 @@
+import argparse
+import re
+import time
+from board import Chess
+from pieces import Pawn, King
+from rules import GameResult, game_result, is_check
+
+START_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+RESULTS = ('1-0', '0-1', '1/2-1/2', '*')
+SEVEN_TAG_ROSTER = ('Event', 'Site', 'Date', 'Round', 'White', 'Black', 'Result')
+
+HEADER_RE = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+# Comments, NAGs and move numbers carry no moves; parentheses are kept to skip variations
+NOISE_RE = re.compile(r'\{[^}]*\}|;[^\n]*|\$\d+|\d+\.(?:\.\.)?')
+SUFFIX_RE = re.compile(r'[+#!?]+$')
+
+
+def read_games(stream):
+    """
+    Reads a PGN stream lazily, one game at a time, so databases of any size can be replayed.
+    Yields (headers, movetext) pairs; movetext keeps its line breaks, which end ';' comments.
+    """
+    headers = {}
+    movetext = []
+    for line in stream:
+        line = line.strip()
+        if line.startswith('%'):
+            continue  # Escape line
+        if line.startswith('['):
+            if movetext:
+                yield headers, '\n'.join(movetext)
+                headers, movetext = {}, []
+            match = HEADER_RE.match(line)
+            if match:
+                headers[match.group(1)] = match.group(2).replace('\\"', '"').replace('\\\\', '\\')
+        elif line:
+            movetext.append(line)
+    if headers or movetext:
+        yield headers, '\n'.join(movetext)
+
+
+def san_tokens(movetext):
+    """
+    Yields the SAN moves of the main line of a movetext, skipping comments, NAGs, move numbers,
+    variations and the result.
+    """
+    depth = 0
+    for token in NOISE_RE.sub(' ', movetext).replace('(', ' ( ').replace(')', ' ) ').split():
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+        elif depth == 0 and token not in RESULTS:
+            yield token
+
+
+def san_base(move, legal):
+    """
+    Writes a move in SAN without the check suffix.
+    legal: The legal moves of the position, used for disambiguation.
+    """
+    piece, from_pos, to_pos = move[:3]
+    target = Chess.array_2_board(to_pos)
+    if isinstance(piece, King) and abs(to_pos[1] - from_pos[1]) == 2:
+        return 'O-O' if to_pos[1] == 6 else 'O-O-O'
+    game = piece.game
+    capture = game.board[to_pos[0]][to_pos[1]] != 0
+    if isinstance(piece, Pawn):
+        if from_pos[1] != to_pos[1]:
+            san = 'abcdefgh'[from_pos[1]] + 'x' + target  # Pawn captures, including en passant
+        else:
+            san = target
+        if to_pos[0] == 0 or to_pos[0] == 7:
+            san += '=' + (move[3] if len(move) > 3 else 'Q')
+        return san
+    # Other pieces of the same kind that can reach the same square
+    rivals = [other[1] for other in legal
+              if other[2] == to_pos and other[1] != from_pos and other[0].notation == piece.notation]
+    prefix = piece.notation
+    if rivals:
+        if all(pos[1] != from_pos[1] for pos in rivals):
+            prefix += 'abcdefgh'[from_pos[1]]
+        elif all(pos[0] != from_pos[0] for pos in rivals):
+            prefix += str(8 - from_pos[0])
+        else:
+            prefix += Chess.array_2_board(from_pos)
+    return prefix + ('x' if capture else '') + target
+
+
+def legal_move_list(game):
+    """
+    Returns the legal moves of the side to move in the (piece, from_pos, to_pos[, promotion]) form.
+    """
+    return [(piece, start_pos) + end_pos[1:] for piece, start_pos, end_pos in game.get_legal_moves(game.p_move)]
+
+
+def san_table(game):
+    """
+    Maps the SAN of every legal move of the side to move (without check suffix) to the move.
+    Disambiguation is resolved once per position, so decoding a move is a dictionary lookup.
+    """
+    legal = legal_move_list(game)
+    return {san_base(move, legal): move for move in legal}
+
+
+def move_to_san(game, move, legal=None):
+    """
+    Writes a legal move of the side to move in SAN, including the '+' or '#' suffix.
+    """
+    if legal is None:
+        legal = legal_move_list(game)
+    san = san_base(move, legal)
+    game.make_move(move)
+    if is_check(game, game.p_move):
+        san += '#' if not game.get_legal_moves(game.p_move) else '+'
+    game.unmake_move()
+    return san
+
+
+def parse_san(game, san, table=None):
+    """
+    Finds the legal move of the side to move written in SAN. Returns None if there is no such move.
+    Check and annotation suffixes are ignored; '0-0' castling and promotions without '=' are accepted.
+    """
+    if table is None:
+        table = san_table(game)
+    san = SUFFIX_RE.sub('', san).replace('0', 'O')
+    move = table.get(san)
+    if move is None and len(san) > 2 and san[-1] in 'QRBN' and san[-2] != '=':
+        move = table.get(san[:-1] + '=' + san[-1])
+    return move
+
+
+def load_game(headers, movetext):
+    """
+    Replays a game read by read_games with make_move, starting from its FEN header if any.
+    Returns the game, or raises ValueError at the first illegal or unreadable move.
+    """
+    game = Chess(headers.get('FEN', START_FEN))
+    for san in san_tokens(movetext):
+        move = parse_san(game, san)
+        if move is None:
+            raise ValueError(f"Illegal move {san!r} in game {headers.get('White', '?')} - {headers.get('Black', '?')}")
+        game.make_move(move)
+    return game
+
+
+def played_moves(game):
+    """
+    Returns the moves played on a game since its initial position, in the form taken by make_move.
+    The game is walked back to its start and replayed, so promotions keep the piece actually chosen.
+    """
+    moves = []
+    while game.stack:
+        piece, from_pos, to_pos, _, special = game.stack[-1][:5]
+        if special == "promotion":
+            moves.append((piece, from_pos, to_pos, game.board[to_pos[0]][to_pos[1]].notation))
+        else:
+            moves.append((piece, from_pos, to_pos))
+        game.unmake_move()
+    moves.reverse()
+    for move in moves:
+        game.make_move(move)
+    return moves
+
+
+def result_string(game):
+    result = game_result(game)
+    if result == GameResult.CHECKMATE:
+        return '0-1' if game.p_move == 1 else '1-0'
+    if result in (GameResult.STALEMATE, GameResult.DRAW):
+        return '1/2-1/2'
+    return '*'
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+
+def write_game(game, headers=None):
+    """
+    Writes a game played on a Chess object (through Chess.move or make_move) as PGN text.
+    headers: Extra tags; the Seven Tag Roster is filled with '?' where missing.
+    """
+    tags = {tag: '?' for tag in SEVEN_TAG_ROSTER}
+    tags['Date'] = time.strftime('%Y.%m.%d')
+    tags['Result'] = result_string(game)
+    if headers:
+        tags.update(headers)
+    if game.init_pos.split()[:4] != START_FEN.split()[:4]:
+        tags['SetUp'] = '1'
+        tags['FEN'] = game.init_pos
+
+    moves = played_moves(game)
+    for _ in moves:
+        game.unmake_move()
+    tokens = []
+    for move in moves:
+        if game.p_move == 1:
+            tokens.append(f'{game.fullmove_number}.')
+        elif not tokens:
+            tokens.append(f'{game.fullmove_number}...')
+        tokens.append(move_to_san(game, move))
+        game.make_move(move)
+    tokens.append(tags['Result'])
+
+    lines = [f'[{tag} "{escape(value)}"]' for tag, value in tags.items()]
+    lines.append('')
+    line = ''
+    for token in tokens:
+        # Movetext lines are kept under 80 characters
+        if line and len(line) + 1 + len(token) > 79:
+            lines.append(line)
+            line = token
+        else:
+            line = f'{line} {token}' if line else token
+    lines.append(line)
+    return '\n'.join(lines) + '\n\n'
+
+
+def save_game(game, path, headers=None):
+    """
+    Appends a game to a PGN file.
+    """
+    with open(path, 'a') as file:
+        file.write(write_game(game, headers))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replay every game of a PGN file and report the parsing speed.')
+    parser.add_argument('path')
+    args = parser.parse_args()
+    games = moves = errors = 0
+    start = time.perf_counter()
+    with open(args.path) as stream:
+        for headers, movetext in read_games(stream):
+            try:
+                moves += len(load_game(headers, movetext).stack)
+                games += 1
+            except ValueError as error:
+                errors += 1
+                print(error)
+    elapsed = time.perf_counter() - start
+    print(f"{games} games, {moves} moves, {errors} errors in {elapsed:.2f}s ({moves / max(elapsed, 1e-9):.0f} moves/s)")
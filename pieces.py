@@ -1,3 +1,62 @@
+# Move tables computed once at import, indexed by row * 8 + column. Each entry is a (move, row, column)
+# triple whose move is the shared (from_pos, to_pos) tuple returned by movement(), so no target is allocated
+KNIGHT_STEPS = ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1))
+KING_STEPS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+DIAGONALS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+STRAIGHTS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+def _step_table(steps):
+    table = []
+    for square in range(64):
+        pos = divmod(square, 8)
+        table.append(tuple(((pos, (pos[0] + dx, pos[1] + dy)), pos[0] + dx, pos[1] + dy)
+                           for dx, dy in steps if 0 <= pos[0] + dx < 8 and 0 <= pos[1] + dy < 8))
+    return table
+
+
+def _ray_table(directions):
+    # One tuple of rays per square; each ray runs outward from the square to the edge of the board
+    table = []
+    for square in range(64):
+        pos = divmod(square, 8)
+        rays = []
+        for dx, dy in directions:
+            ray = []
+            x, y = pos[0] + dx, pos[1] + dy
+            while 0 <= x < 8 and 0 <= y < 8:
+                ray.append(((pos, (x, y)), x, y))
+                x, y = x + dx, y + dy
+            if ray:
+                rays.append(tuple(ray))
+        table.append(tuple(rays))
+    return table
+
+
+KNIGHT_MOVES = _step_table(KNIGHT_STEPS)
+KING_MOVES = _step_table(KING_STEPS)
+BISHOP_RAYS = _ray_table(DIAGONALS)
+ROOK_RAYS = _ray_table(STRAIGHTS)
+QUEEN_RAYS = [bishop + rook for bishop, rook in zip(BISHOP_RAYS, ROOK_RAYS)]
+
+
+def slide(board, color, rays):
+    """
+    Collects the moves along each ray up to the first blocker, which is included when it is an enemy piece.
+    """
+    result = []
+    for ray in rays:
+        for move, x, y in ray:
+            next_cell = board[x][y]
+            if next_cell == 0:  # Empty cell
+                result.append(move)
+            else:
+                if next_cell.color != color:  # Opponent's piece
+                    result.append(move)
+                break
+    return result
+
+
 class Piece:
     def __init__(self, game, color, value, position=None):
         self.game = game
@@ -24,7 +83,7 @@ class Piece:
 
 class Pawn(Piece):
     def __init__(self, game, color, position=None):
-        super().__init__(game, color, 1)
+        super().__init__(game, color, 1, position)
         self.notation = 'P'
 
     def movement(self, player, pos, capture=True):
@@ -42,7 +101,7 @@ class Pawn(Piece):
             if 0 <= next_row < 8:
                 next_cell = self.game.board[next_row][next_col]
                 if not isinstance(next_cell, Piece):
-                    result.append((pos, next_pos))
+                    self.add_move(result, pos, next_pos)
                 else:
                     break  # The pawn cannot move further if the next cell is occupied
             else:
@@ -57,119 +116,69 @@ class Pawn(Piece):
                 if 0 <= next_row < 8 and 0 <= next_col < 8:
                     next_cell = self.game.board[next_row][next_col]
                     if isinstance(next_cell, Piece) and next_cell.color != self.color:
-                        result.append((pos, next_pos))
-                elif self.game.en_passant and pos[0] == self.game.en_passant[0] and pos[1] + i == self.game.en_passant[1]:
-                    result.append((pos, next_pos))
+                        self.add_move(result, pos, next_pos)
+                    elif next_pos == self.game.en_passant and next_row == (2 if self.color == 1 else 5):
+                        result.append((pos, next_pos))  # En passant capture onto the skipped square
 
         return result
 
+    @staticmethod
+    def add_move(result, pos, next_pos):
+        # A pawn reaching the last rank promotes; each promotion piece is a separate move
+        if next_pos[0] == 0 or next_pos[0] == 7:
+            for promotion in 'QRBN':
+                result.append((pos, next_pos, promotion))
+        else:
+            result.append((pos, next_pos))
+
 class Knight(Piece):
     def __init__(self, game, color, position=None):
-        super().__init__(game, color, 2)
+        super().__init__(game, color, 2, position)
         self.notation = 'N'
 
     def movement(self, player, pos, capture=True):
+        board = self.game.board
         result = []
-        for dx, dy in [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]:
-            x, y = pos[0] + dx, pos[1] + dy
-            if 0 <= x < 8 and 0 <= y < 8 and (not isinstance(self.game.board[x][y], Piece) or self.game.board[x][y].value * player < 0):
-                result.append((pos, (x, y)))
+        for move, x, y in KNIGHT_MOVES[pos[0] * 8 + pos[1]]:
+            next_cell = board[x][y]
+            if next_cell == 0 or next_cell.color != self.color:
+                result.append(move)
         return result
 
 class Bishop(Piece):
     def __init__(self, game, color, position=None):
-        super().__init__(game, color, 3)
+        super().__init__(game, color, 3, position)
         self.notation = 'B'
 
     def movement(self, player, pos, capture=True):
-        result = []
-        directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]  # Diagonal directions
-        for dx, dy in directions:
-            x, y = pos
-            while True:
-                x, y = x + dx, y + dy
-                if not (0 <= x < 8 and 0 <= y < 8):
-                    break  # Out of board
-                next_cell = self.game.board[x][y]
-                if not isinstance(next_cell, Piece):  # Empty cell
-                    result.append((pos, (x, y)))
-                elif next_cell.color != self.color:  # Opponent's piece
-                    result.append((pos, (x, y)))
-                    break
-                else:
-                    break  # Own piece blocking
-        return result
+        return slide(self.game.board, self.color, BISHOP_RAYS[pos[0] * 8 + pos[1]])
 
 class Rook(Piece):
     def __init__(self, game, color, position=None):
-        super().__init__(game, color, 4)
+        super().__init__(game, color, 4, position)
         self.notation = 'R'
         
     def movement(self, player, pos, capture=True):
-        result = []
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # Vertical and horizontal directions
-        for dx, dy in directions:
-            x, y = pos
-            while True:
-                x, y = x + dx, y + dy
-                if not (0 <= x < 8 and 0 <= y < 8):
-                    break  # Out of board
-                next_cell = self.game.board[x][y]
-                if not isinstance(next_cell, Piece):  # Empty cell
-                    result.append((pos, (x, y)))
-                elif next_cell.color != self.color:  # Opponent's piece
-                    result.append((pos, (x, y)))
-                    break
-                else:
-                    break  # Own piece blocking
-        return result
-
-    def move(self, player, from_pos, to_pos):
-        move_result = super().move(from_pos, to_pos)
-        if move_result:
-            # Check if a rook is moved from its initial position
-            if from_pos == (7 if player == -1 else 0, 0) or from_pos == (7 if player == -1 else 0, 7):
-                if from_pos == (7 if player == -1 else 0, 0) and isinstance(self.game.board[7 if player == -1 else 0][0], Piece) and self.game.board[7 if player == -1 else 0][0].value == -4:  # Black rook
-                    self.game.castling[1] = 0  # Disabling queen-side castling for black
-                elif from_pos == (7 if player == -1 else 0, 7) and isinstance(self.game.board[7 if player == -1 else 0][7], Piece) and self.game.board[7 if player == -1 else 0][7].value == -4:  # Black rook
-                    self.game.castling[0] = 0  # Disabling king-side castling for black
-                elif from_pos == (0 if player == 1 else 7, 0) and isinstance(self.game.board[0 if player == 1 else 7][0], Piece) and self.game.board[0 if player == 1 else 7][0].value == 4:  # White rook
-                    self.game.castling[1] = 0  # Disabling queen-side castling for white
-                elif from_pos == (0 if player == 1 else 7, 7) and isinstance(self.game.board[0 if player == 1 else 7][7], Piece) and self.game.board[0 if player == 1 else 7][7].value == 4:  # White rook
-                    self.game.castling[0] = 0  # Disabling king-side castling for white
-        return move_result
+        return slide(self.game.board, self.color, ROOK_RAYS[pos[0] * 8 + pos[1]])
 
 class Queen(Piece):
     def __init__(self, game, color, position=None):
-        super().__init__(game, color, 5)
+        super().__init__(game, color, 5, position)
         self.notation = 'Q'
 
     def movement(self, player, pos, capture=True):
-        bishop_moves = Bishop(self.game, self.color).movement(player, pos, capture)
-        rook_moves = Rook(self.game, self.color).movement(player, pos, capture)
-        return bishop_moves + rook_moves
+        return slide(self.game.board, self.color, QUEEN_RAYS[pos[0] * 8 + pos[1]])
 
 class King(Piece):
     def __init__(self, game, color, position=None):
-        super().__init__(game, color, 6)
+        super().__init__(game, color, 6, position)
         self.notation = 'K'
 
     def movement(self, player, pos, capture=True):
+        board = self.game.board
         result = []
-        directions = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]  # All directions
-        for dx, dy in directions:
-            x, y = pos[0] + dx, pos[1] + dy
-            if 0 <= x < 8 and 0 <= y < 8:
-                next_cell = self.game.board[x][y]
-                if not isinstance(next_cell, Piece) or next_cell.color != self.color:
-                    result.append((pos, (x, y)))
+        for move, x, y in KING_MOVES[pos[0] * 8 + pos[1]]:
+            next_cell = board[x][y]
+            if next_cell == 0 or next_cell.color != self.color:
+                result.append(move)
         return result
-
-    def move(self, player, from_pos, to_pos):
-        move_result = self.game.move((self.game.board[from_pos[0]][from_pos[1]], from_pos, to_pos))
-        if move_result:
-            # Disabling castling when the king is moved
-            if from_pos == (7 if player == -1 else 0, 4):  # Initial position of the king
-                self.game.castling[0] = 0  # Disabling king-side castling
-                self.game.castling[1] = 0  # Disabling queen-side castling
-        return move_result
@@ -0,0 +1,126 @@
+import cProfile
+import json
+import pstats
+import time
+
+PROFILE_ENTRIES = 25  # Functions kept from a profiled search, by cumulative time
+
+
+class SearchStats:
+    def __init__(self, tt):
+        """
+        Statistics of one search, filled in by AI.find_best_move and exported as a dictionary or JSON.
+        Counters of the transposition table are snapshotted so only this search is counted.
+        """
+        self.tt = tt
+        self.tt_hits_before = tt.hits
+        self.tt_misses_before = tt.misses
+        self.start = time.perf_counter()
+        self.time = 0.0
+        self.nodes = 0
+        self.qnodes = 0
+        self.nps = 0.0
+        self.depth = 0
+        self.seldepth = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.cutoffs_by_index = []
+        self.first_move_cutoff_rate = 0.0
+        self.iteration_nodes = []  # Nodes searched by each completed iteration
+        self.ebf = 0.0  # Effective branching factor: the growth in nodes from one iteration to the next
+        self.mean_ebf = 0.0
+        self.null_cutoffs = 0
+        self.lmr_researches = 0
+        self.pvs_researches = 0
+        self.extensions = 0
+        self.timings = {'movegen': 0.0, 'legality': 0.0, 'eval': 0.0}  # Seconds, when collected
+        self.profile = None
+        self.profiler = None
+
+    def timed(self, name, function):
+        """
+        Wraps a function so the time spent in it is added to timings[name].
+        """
+        timings = self.timings
+        clock = time.perf_counter
+
+        def wrapper(*args):
+            start = clock()
+            try:
+                return function(*args)
+            finally:
+                timings[name] += clock() - start
+        return wrapper
+
+    def start_profile(self):
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    def finish(self, ai):
+        """
+        Reads the counters of a finished search from the AI.
+        """
+        if self.profiler is not None:
+            self.profiler.disable()
+            profile = pstats.Stats(self.profiler)
+            profile.sort_stats('cumulative')
+            self.profile = [
+                {'function': f'{path}:{line}({name})', 'calls': calls, 'tottime': tottime, 'cumtime': cumtime}
+                for (path, line, name), (_, calls, tottime, cumtime, _) in
+                sorted(profile.stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_ENTRIES]
+            ]
+            self.profiler = None
+        self.time = time.perf_counter() - self.start
+        self.nodes = ai.nodes
+        self.qnodes = ai.qnodes
+        self.nps = self.nodes / self.time if self.time else 0.0
+        self.depth = ai.completed_depth
+        self.seldepth = ai.seldepth
+        self.tt_hits = self.tt.hits - self.tt_hits_before
+        self.tt_probes = self.tt_hits + self.tt.misses - self.tt_misses_before
+        self.cutoffs_by_index = list(ai.orderer.cutoff_indexes)
+        self.first_move_cutoff_rate = ai.orderer.first_move_cutoffs / ai.orderer.cut_nodes if ai.orderer.cut_nodes else 0.0
+        self.iteration_nodes = list(ai.iteration_nodes)
+        ratios = [current / previous for previous, current in zip(self.iteration_nodes, self.iteration_nodes[1:]) if previous]
+        self.ebf = ratios[-1] if ratios else 0.0
+        self.mean_ebf = sum(ratios) / len(ratios) if ratios else 0.0
+        self.null_cutoffs = ai.null_cutoffs
+        self.lmr_researches = ai.lmr_researches
+        self.pvs_researches = ai.pvs_researches
+        self.extensions = ai.extensions
+
+    def to_dict(self):
+        cutoffs = sum(self.cutoffs_by_index)
+        return {
+            'nodes': self.nodes,
+            'qnodes': self.qnodes,
+            'time': self.time,
+            'nps': self.nps,
+            'depth': self.depth,
+            'seldepth': self.seldepth,
+            'tt_probes': self.tt_probes,
+            'tt_hits': self.tt_hits,
+            'tt_hit_rate': self.tt_hits / self.tt_probes if self.tt_probes else 0.0,
+            'cutoffs_by_index': self.cutoffs_by_index,
+            'cutoff_rate_by_index': [count / cutoffs if cutoffs else 0.0 for count in self.cutoffs_by_index],
+            'first_move_cutoff_rate': self.first_move_cutoff_rate,
+            'iteration_nodes': self.iteration_nodes,
+            'ebf': self.ebf,
+            'mean_ebf': self.mean_ebf,
+            'null_cutoffs': self.null_cutoffs,
+            'lmr_researches': self.lmr_researches,
+            'pvs_researches': self.pvs_researches,
+            'extensions': self.extensions,
+            'timings': dict(self.timings),
+            'profile': self.profile,
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def summary(self):
+        """
+        One-line summary for the console.
+        """
+        return (f"depth {self.depth}/{self.seldepth}, {self.nodes} nodes ({self.qnodes} quiescence) in {self.time:.2f}s, "
+                f"{self.nps:.0f} nodes/s, TT hit rate {self.to_dict()['tt_hit_rate']:.0%}")
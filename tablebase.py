@@ -0,0 +1,97 @@
+import argparse
+import os
+
+# The Syzygy files are read by python-chess, an optional dependency (pip install chess)
+try:
+    import chess
+    import chess.syzygy
+except ImportError:
+    chess = None
+
+WDL_EXTENSION = '.rtbw'  # Win/draw/loss tables, e.g. KRPvKR.rtbw; .rtbz files hold the DTZ tables
+PHASE_PER_PIECE = 4  # The largest PHASE_WEIGHTS entry, so a phase above 4 * (n - 2) means more than n pieces
+
+# WDL values, from the side to move's point of view; cursed wins and blessed losses are decided by
+# the fifty-move rule, so the search scores them as draws
+WIN, CURSED_WIN, DRAW, BLESSED_LOSS, LOSS = 2, 1, 0, -1, -2
+
+
+class Tablebase:
+    def __init__(self, directory):
+        """
+        Probes the Syzygy tables in a directory: WDL (win/draw/loss) in the search and DTZ (distance to the
+        next capture or pawn move) at the root. Files are opened and memory-mapped on first use, so unused
+        tables cost nothing and the pages are shared by every process probing them.
+        """
+        self.directory = directory
+        files = os.listdir(directory) if os.path.isdir(directory) else []
+        names = [name[:-len(WDL_EXTENSION)] for name in files if name.endswith(WDL_EXTENSION)]
+        self.max_pieces = max((len(name) - 1 for name in names), default=0)  # KRvK: 'v' is not a piece
+        if self.max_pieces and chess is None:
+            raise ImportError("Probing Syzygy tables needs python-chess: pip install chess")
+        self.tables = None  # The python-chess prober, created on the first probe
+        self.probes = 0
+        self.hits = 0
+
+    def position(self, game):
+        """
+        Returns the position as a python-chess board when the tables may cover it, or None when it has
+        more pieces than the largest table or castling rights, which Syzygy tables leave out.
+        """
+        if not self.max_pieces or game.phase > PHASE_PER_PIECE * (self.max_pieces - 2) or any(game.castling):
+            return None
+        if sum(1 for row in game.board for piece in row if piece != 0) > self.max_pieces:
+            return None
+        if self.tables is None:
+            self.tables = chess.syzygy.open_tablebase(self.directory)
+        return chess.Board(game.to_fen())
+
+    def probe_wdl(self, game):
+        """
+        Looks up the WDL value of a position for the side to move: WIN, CURSED_WIN, DRAW, BLESSED_LOSS or LOSS.
+        Returns None when no table covers the position.
+        """
+        board = self.position(game)
+        if board is None:
+            return None
+        self.probes += 1
+        wdl = self.tables.get_wdl(board)
+        if wdl is not None:
+            self.hits += 1
+        return wdl
+
+    def probe_dtz(self, game):
+        """
+        Looks up the distance in plies to the next capture or pawn move on the best line: positive when the
+        side to move wins, negative when it loses, 0 for draws, and beyond 100 in absolute value when the
+        fifty-move rule turns the result into a draw. Returns None when no table covers the position.
+        """
+        board = self.position(game)
+        if board is None:
+            return None
+        self.probes += 1
+        dtz = self.tables.get_dtz(board)
+        if dtz is not None:
+            self.hits += 1
+        return dtz
+
+    def close(self):
+        if self.tables is not None:
+            self.tables.close()
+            self.tables = None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Probe a position in the Syzygy tables of a directory.')
+    parser.add_argument('directory')
+    parser.add_argument('fen')
+    args = parser.parse_args()
+    from board import Chess
+    game = Chess(args.fen)
+    tablebase = Tablebase(args.directory)
+    wdl = tablebase.probe_wdl(game)
+    if wdl is None:
+        print('no table')
+    else:
+        print(f"{('loss', 'blessed loss', 'draw', 'cursed win', 'win')[wdl + 2]}, dtz {tablebase.probe_dtz(game)}")
+    tablebase.close()
@@ -0,0 +1,35 @@
+import threading
+from board import Chess
+from ai import AI, CHECKMATE_SCORE, mate_in
+
+KIWIPETE = 'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1'
+
+
+def test_budget_applies_to_the_first_iteration():
+    """
+    A node budget or a stop stops even the first iteration, which then returns a legal root move.
+    """
+    game = Chess(KIWIPETE)
+    ai = AI(game, 1)
+    move = ai.find_best_move(max_nodes=100)
+    assert ai.nodes < 200 and ai.completed_depth == 0
+    assert move in game.generate_moves(1) and ai.pv == [move]
+    ai.stop_event = threading.Event()
+    ai.stop_event.set()
+    move = ai.find_best_move(5)
+    assert ai.nodes < 150 and move in game.generate_moves(1)
+
+
+def test_mate_in():
+    assert mate_in(CHECKMATE_SCORE - 1) == 1 and mate_in(CHECKMATE_SCORE - 3) == 2
+    assert mate_in(-(CHECKMATE_SCORE - 2)) == -1 and mate_in(150) is None
+
+
+def test_last_stats_carry_the_search_counters():
+    game = Chess(KIWIPETE)
+    ai = AI(game, 1)
+    ai.find_best_move(3)
+    stats = ai.last_stats.to_dict()
+    assert stats['depth'] == 3 and len(stats['iteration_nodes']) == 3
+    assert sum(stats['iteration_nodes']) == stats['nodes'] and stats['ebf'] > 1
+    assert stats['pvs_researches'] >= 0
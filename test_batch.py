@@ -0,0 +1,33 @@
+import io
+import json
+from batch import read_positions, run_batch
+
+POSITIONS = '''# Opening, a bad position and a mate in one
+rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1
+8/8/8/8/8/8/8/8 w - - ; bad
+r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - id "kiwipete";
+
+k7/8/1K6/8/8/8/7R/8 w - - 0 1
+'''
+
+
+def test_read_positions():
+    positions = list(read_positions(io.StringIO(POSITIONS)))
+    assert [number for number, _, _ in positions] == [2, 3, 4, 6]
+    assert positions[2][1:] == ('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq -', 'kiwipete')
+    assert positions[3][1] == 'k7/8/1K6/8/8/8/7R/8 w - - 0 1'
+
+
+def test_results_keep_the_input_order_with_workers():
+    """
+    Two worker processes analyse the positions, and the JSON lines come back in input order
+    with the position without kings marked invalid.
+    """
+    output = io.StringIO()
+    assert run_batch(io.StringIO(POSITIONS), output, workers=2, depth=2) == 4
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [result['line'] for result in results] == [2, 3, 4, 6]
+    assert results[1]['error'] == 'invalid position' and 'bestmove' not in results[1]
+    assert results[2]['id'] == 'kiwipete' and results[2]['depth'] == 2
+    assert results[3]['bestmove'] == 'h2h8' and results[3]['mate'] == 1
+    assert all('error' not in result for i, result in enumerate(results) if i != 1)
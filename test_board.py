@@ -0,0 +1,102 @@
+import random
+import pytest
+from board import BACKENDS, Chess
+from rules import is_check
+from zobrist import compute_hash
+from evaluation import compute_scores
+
+# Positions rich in castling, en passant and promotions, for the random playouts
+PLAYOUT_POSITIONS = (
+    'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+    'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+    '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+)
+PLAYOUT_PLIES = 40
+SPECIAL_FLAGS = (2, 3, 5)  # Castling and en passant, besides promotions
+
+E2E4 = ((6, 4), (4, 4))
+
+
+@pytest.mark.parametrize('name', sorted(BACKENDS))
+def test_move_returns_played_and_reason(name):
+    """
+    Every core validates moves the same way and returns (played, reason) like Chess.move.
+    """
+    game = BACKENDS[name]()
+    assert game.move((None,) + E2E4) == (False, "The starting position is empty.")
+    piece = next(move[0] for move in game.get_legal_moves(1) if move[1] == E2E4[0])
+    assert game.move((piece, (6, 4), (3, 4)))[0] is False
+    assert game.move((piece,) + E2E4) == (True, "The move is valid.")
+    assert game.move((piece,) + E2E4)[0] is False
+    assert game.p_move == -1
+
+
+@pytest.mark.parametrize('name', sorted(set(BACKENDS) - {'objects'}))
+@pytest.mark.parametrize('fen', PLAYOUT_POSITIONS)
+def test_cores_pack_moves_like_chess(name, fen):
+    """
+    Every core packs moves with the moves.py encoding, so a packed move means the same on all of them.
+    """
+    game = Chess(fen)
+    assert sorted(BACKENDS[name](fen).generate_moves()) == sorted(game.generate_moves(game.p_move))
+
+
+def test_fen_placement_is_written_canonically():
+    """
+    A placement with split empty-square counts is read, but to_fen writes the canonical form.
+    """
+    game = Chess('rnbqkbnr/pppppppp/44/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1')
+    assert game.to_fen() == 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+
+
+def playout(fen, seed, state, expected, special):
+    """
+    Plays random moves and null moves, preferring castling, en passant and promotions, and checks after
+    every make and unmake that the incremental state matches the one computed from scratch.
+    special: Set collecting the kinds of special moves played.
+    """
+    game = Chess(fen)
+    rng = random.Random(seed)
+    states = []
+    for _ in range(PLAYOUT_PLIES):
+        moves = game.generate_moves(game.p_move)
+        if not moves:
+            break
+        states.append(state(game))
+        if rng.random() < 0.1 and not is_check(game, game.p_move):
+            game.make_null_move()
+            states[-1] += ('null',)
+            special.add('null')
+        else:
+            preferred = [move for move in moves if move >> 12 in SPECIAL_FLAGS or move >> 15]
+            move = rng.choice(preferred if preferred and rng.random() < 0.7 else moves)
+            game.make_move(move)
+            special.add('promotion' if move >> 15 else move >> 12)
+        assert state(game) == expected(game)
+    while states:
+        before = states.pop()
+        if before[-1] == 'null':
+            game.unmake_null_move()
+            before = before[:-1]
+        else:
+            game.unmake_move()
+        assert state(game) == before == expected(game)
+
+
+def test_incremental_hash_matches_a_full_computation():
+    special = set()
+    for seed in range(10):
+        for fen in PLAYOUT_POSITIONS:
+            playout(fen, seed, lambda game: (game.hash,), lambda game: (compute_hash(game),), special)
+    assert special >= {2, 3, 5, 'promotion', 'null'}
+
+
+def test_incremental_scores_match_a_full_computation():
+    """
+    The tapered evaluation's middlegame, endgame and phase sums follow every make and unmake.
+    """
+    special = set()
+    for seed in range(10):
+        for fen in PLAYOUT_POSITIONS:
+            playout(fen, seed, lambda game: (game.mg_score, game.eg_score, game.phase), compute_scores, special)
+    assert special >= {2, 3, 5, 'promotion', 'null'}
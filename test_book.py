@@ -0,0 +1,58 @@
+from board import Chess
+from book import OpeningBook, build_book, encode_move, decode_move
+from polyglot import polyglot_key
+
+# Keys of the Polyglot specification, reached from the starting position
+SPEC_KEYS = (
+    ('', 0x463B96181691FC9C),
+    ('e2e4', 0x823C9B50FD114196),
+    ('e2e4 d7d5', 0x0756B94461C50FB0),
+    ('e2e4 d7d5 e4e5', 0x662FAFB965DB29D4),
+    ('e2e4 d7d5 e4e5 f7f5', 0x22A48B5A8E47FF78),
+    ('e2e4 d7d5 e4e5 f7f5 e1e2', 0x652A607CA3F242C1),
+    ('e2e4 d7d5 e4e5 f7f5 e1e2 e8f7', 0x00FDD303C946BDD9),
+    ('a2a4 b7b5 h2h4 b5b4 c2c4', 0x3C8123EA7B067637),
+    ('a2a4 b7b5 h2h4 b5b4 c2c4 b4c3 a1a3', 0x5C3F9B829B279560),
+)
+
+
+def play(moves):
+    game = Chess()
+    for uci in moves.split():
+        game.make_move(game.parse_uci(uci))
+    return game
+
+
+def test_polyglot_keys():
+    for moves, key in SPEC_KEYS:
+        assert polyglot_key(play(moves)) == key, moves
+
+
+def test_en_passant_square_only_counts_when_capturable():
+    assert polyglot_key(Chess('rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1')) == \
+        polyglot_key(Chess('rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1'))
+
+
+def test_castling_moves_are_written_as_king_takes_rook():
+    game = Chess('r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1')
+    move = game.parse_uci('e1g1')
+    code = encode_move(move)
+    assert code == 7 | 4 << 6  # e1h1
+    assert decode_move(game, code) == move
+
+
+def test_build_and_probe(tmp_path):
+    pgn = tmp_path / 'games.pgn'
+    pgn.write_text('[Result "1-0"]\n\n1. e4 e5 2. Nf3 1-0\n\n[Result "0-1"]\n\n1. e4 c5 0-1\n\n[Result "1/2-1/2"]\n\n1. d4 1/2-1/2\n')
+    path = tmp_path / 'book.bin'
+    assert build_book([str(pgn)], str(path)) == 4  # e4, d4, then c5 and Nf3 by the winners; the loser's e5 scores 0
+    book = OpeningBook(str(path), seed=1)
+    try:
+        weights = {Chess.move_to_uci(move): weight for move, weight in book.moves(Chess())}
+        assert weights == {'e2e4': 2, 'd2d4': 1}
+        # A FEN that leaves out the en passant square finds the same entries
+        game = Chess('rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1')
+        assert sorted(Chess.move_to_uci(move) for move, _ in book.moves(game)) == ['c7c5']
+        assert book.moves(Chess('8/8/8/8/8/8/8/K1k5 w - - 0 1')) == []
+    finally:
+        book.close()
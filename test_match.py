@@ -0,0 +1,55 @@
+import math
+import pytest
+from match import MatchStats, elo, expected_score, parse_engine
+
+
+def stats_with(wins, draws, losses, **kwargs):
+    stats = MatchStats(**kwargs)
+    for score, count in ((1, wins), (0.5, draws), (0, losses)):
+        for _ in range(count):
+            stats.add(score, 'test')
+    return stats
+
+
+def test_elo_conversion():
+    assert elo(0.5) == 0
+    assert elo(2 / 3) == pytest.approx(120.41, abs=0.01)  # -400 * log10(1 / 2)
+    assert expected_score(elo(0.75)) == pytest.approx(0.75)
+
+
+def test_elo_estimate_and_error_bar():
+    """
+    +6 =4 -2: score 2/3, per-game variance (6/9 + 4/36 + 8/9) / 12 = 5/36, so the 95% interval of the
+    score is 2/3 +/- 1.96 * sqrt(5/432) and its half-width in Elo is (342.11 + 30.79) / 2.
+    """
+    stats = stats_with(6, 4, 2)
+    assert stats.games == 12 and stats.score() == pytest.approx(2 / 3)
+    assert stats.variance() == pytest.approx(5 / 36)
+    difference, margin = stats.elo()
+    assert difference == pytest.approx(120.41, abs=0.01)
+    assert margin == pytest.approx(186.45, abs=0.05)
+    assert stats_with(3, 0, 0).elo() == (math.inf, math.inf)
+    assert MatchStats().elo() == (0.0, math.inf)
+
+
+def test_llr_and_bounds():
+    """
+    With elo0 = 0 and elo1 = 5 the expected scores are 0.5 and 0.507195; the LLR of +6 =4 -2 is
+    12 * 0.007195 * (4/3 - 1.007195) / (2 * 5/36) = 0.1014.
+    """
+    stats = stats_with(6, 4, 2)
+    assert stats.lower_bound == pytest.approx(math.log(0.05 / 0.95)) == pytest.approx(-2.944, abs=0.001)
+    assert stats.upper_bound == pytest.approx(2.944, abs=0.001)
+    assert stats.llr() == pytest.approx(0.1014, abs=0.0005)
+    assert stats.sprt() is None
+    assert stats_with(700, 0, 300).llr() == pytest.approx(6.729, abs=0.005)  # 1000 * 0.007195 * 0.392805 / 0.42
+    assert stats_with(700, 0, 300).sprt() == 'H1'
+    assert stats_with(300, 0, 700).sprt() == 'H0'
+    assert stats_with(5, 0, 0).llr() == 0.0  # No variance yet
+
+
+def test_parse_engine():
+    assert parse_engine('name=new,depth=4,lmr=off', 'x') == {'name': 'new', 'depth': 4, 'lmr': False}
+    assert parse_engine('', 'base') == {'name': 'base', 'depth': 3}
+    with pytest.raises(ValueError):
+        parse_engine('lmr=maybe', 'x')
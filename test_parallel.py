@@ -0,0 +1,34 @@
+from board import Chess
+from parallel import ParallelAI
+
+
+def test_worker_statistics_are_merged():
+    """
+    Selective depth, quiescence nodes, the TT hit rate and the cutoff statistics come from the workers,
+    and the principal variation is no longer than the depth every worker completed.
+    """
+    ai = ParallelAI(Chess('r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3'), 1, workers=2)
+    try:
+        move = ai.find_best_move(3)
+    finally:
+        ai.close()
+    stats = ai.last_stats
+    assert move == ai.pv[0]
+    assert ai.completed_depth == 3 and len(ai.pv) <= 3
+    assert stats.seldepth >= 3 and 0 < stats.qnodes < stats.nodes
+    assert stats.tt_hits > 0 and sum(ai.orderer.cutoff_indexes) == ai.orderer.cut_nodes > 0
+
+
+def test_workers_see_repetitions_of_the_game_history():
+    """
+    Black is a queen down, but going back to e8 repeats the starting position for a third time.
+    """
+    game = Chess('4k3/8/8/8/8/8/8/Q3K1N1 w - - 0 1')
+    for uci in ('g1f3', 'e8d8', 'f3g1', 'd8e8', 'g1f3', 'e8d8', 'f3g1'):
+        game.make_move(game.parse_uci(uci))
+    ai = ParallelAI(game, -1, workers=2)
+    try:
+        move = ai.find_best_move(2)
+    finally:
+        ai.close()
+    assert Chess.move_to_uci(move) == 'd8e8' and ai.best_value == 0
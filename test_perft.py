@@ -0,0 +1,18 @@
+import pytest
+from board import BACKENDS
+from perft import POSITIONS, perft
+
+# Nodes above which a reference count is left out of the quick test suite
+TEST_NODE_LIMIT = 10000
+
+
+@pytest.mark.parametrize('backend', sorted(BACKENDS))
+@pytest.mark.parametrize('name, EPD, counts', POSITIONS, ids=[name for name, _, _ in POSITIONS])
+def test_reference_positions(backend, name, EPD, counts):
+    """
+    Node counts of the reference positions on every backend; the deeper counts are left to `python perft.py`.
+    """
+    game = BACKENDS[backend](EPD)
+    for depth, nodes in counts.items():
+        if nodes <= TEST_NODE_LIMIT:
+            assert perft(game, depth) == nodes, f"{backend} {name} depth {depth}"
@@ -0,0 +1,61 @@
+import io
+from board import Chess
+from pgn import read_games, load_game, write_game, played_moves, move_to_san
+
+COMMENTED_GAME = '''[Event "Test"]
+[White "A"]
+[Black "B"]
+[Result "1-0"]
+
+1. e4 e5 ; king pawn
+2. Nf3 {develops; attacks e5} Nc6 $1 3. Bb5 (3. Bc4 Bc5 (3... Nf6) 4. c3) 3... a6 1-0
+'''
+
+
+def load_first(text):
+    headers, movetext = next(read_games(io.StringIO(text)))
+    return headers, load_game(headers, movetext)
+
+
+def test_comments_and_variations_are_skipped():
+    """
+    Rest-of-line and brace comments, NAGs and nested variations carry no main-line moves.
+    """
+    headers, game = load_first(COMMENTED_GAME)
+    assert headers['White'] == 'A' and headers['Result'] == '1-0'
+    assert len(game.stack) == 6
+    assert game.to_EPD() == 'r1bqkbnr/1ppp1ppp/p1n5/1B2p3/4P3/5N2/PPPP1PPP/RNBQK2R w KQkq -'
+
+
+def test_several_games_are_read_in_order():
+    text = COMMENTED_GAME + '\n[Event "Second"]\n\n1. d4 d5 *\n'
+    games = list(read_games(io.StringIO(text)))
+    assert [headers['Event'] for headers, _ in games] == ['Test', 'Second']
+    assert len(load_game(*games[1]).stack) == 2
+
+
+def test_write_read_round_trip():
+    """
+    A game with castling, en passant, a promotion and a checking move survives writing and reading back.
+    """
+    game = Chess('r3k3/1P6/8/3pP3/8/8/8/R3K3 w Qq d6 0 1')
+    for uci in ('e5d6', 'a8a7', 'e1c1', 'a7a1', 'c1b2', 'e8f7', 'b7b8n'):
+        move = game.parse_uci(uci)
+        assert move is not None, uci
+        game.make_move(move)
+    text = write_game(game, {'Event': 'Round trip'})
+    assert '[FEN "r3k3/1P6/8/3pP3/8/8/8/R3K3 w Qq d6 0 1"]' in text
+    assert 'a1+' in text and 'b8=N' in text
+    headers, loaded = load_first(text)
+    assert headers['Event'] == 'Round trip'
+    assert loaded.to_fen() == game.to_fen()
+    assert [Chess.move_to_uci(move) for move in played_moves(loaded)] == ['e5d6', 'a8a7', 'e1c1', 'a7a1', 'c1b2', 'e8f7', 'b7b8n']
+
+
+def test_san_disambiguation_and_check():
+    game = Chess('4k3/8/8/8/8/8/4K3/R6R w - - 0 1')
+    assert move_to_san(game, game.parse_uci('a1d1')) == 'Rad1'
+    assert move_to_san(game, game.parse_uci('h1h8')) == 'Rh8+'
+    game = Chess('4k3/8/8/8/8/8/8/R3K2R w KQ - 0 1')
+    assert move_to_san(game, game.parse_uci('e1g1')) == 'O-O'
+    assert move_to_san(game, game.parse_uci('e1c1')) == 'O-O-O'
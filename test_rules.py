@@ -0,0 +1,61 @@
+from board import Chess
+from rules import GameResult, game_result
+from ai import AI, CHECKMATE_SCORE
+
+KNIGHT_SHUFFLE = ('g1f3', 'g8f6', 'f3g1', 'f6g8')
+
+
+def play(game, moves):
+    for uci in moves:
+        move = game.parse_uci(uci)
+        assert move is not None, uci
+        game.make_move(move)
+
+
+def test_threefold_repetition():
+    """
+    The starting position recurs after every knight shuffle; the third occurrence is a draw.
+    """
+    game = Chess()
+    play(game, KNIGHT_SHUFFLE)
+    assert game.repetitions() == 1 and game_result(game) == GameResult.ONGOING
+    play(game, KNIGHT_SHUFFLE)
+    assert game.repetitions() == 2 and game_result(game) == GameResult.DRAW
+    game.unmake_move()
+    assert game.repetitions() == 1 and game_result(game) == GameResult.ONGOING
+
+
+def test_repetitions_stop_at_irreversible_moves_and_null_moves():
+    game = Chess()
+    play(game, KNIGHT_SHUFFLE + ('e2e3', 'e7e6') + KNIGHT_SHUFFLE)
+    assert game.repetitions() == 1  # Only the position after e3 e6 repeats
+    game.make_null_move()
+    game.make_null_move()
+    assert game.halfmove_clock == 0 and game.repetitions() == 0
+    game.unmake_null_move()
+    game.unmake_null_move()
+    assert game.repetitions() == 1
+
+
+def test_fifty_move_rule():
+    """
+    The halfmove clock reaches 100 after fifty moves by each side without a capture or pawn move.
+    """
+    game = Chess('7k/8/6K1/8/8/8/R7/8 w - - 99 80')
+    assert game_result(game) == GameResult.ONGOING
+    play(game, ('a2b2',))
+    assert game.halfmove_clock == 100 and game_result(game) == GameResult.DRAW
+    game.unmake_move()
+    assert game.halfmove_clock == 99
+    play(game, ('a2a8',))
+    assert game.halfmove_clock == 100 and game_result(game) == GameResult.CHECKMATE
+
+
+def test_search_prefers_mate_on_the_hundredth_halfmove():
+    """
+    The search scores a mate that reaches the fifty-move limit as a mate, not a draw.
+    """
+    game = Chess('7k/8/6K1/8/8/8/R7/8 w - - 99 80')
+    ai = AI(game, 1)
+    move = ai.find_best_move(2)
+    assert Chess.move_to_uci(move) == 'a2a8' and ai.best_value == CHECKMATE_SCORE - 1
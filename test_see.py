@@ -0,0 +1,19 @@
+import pytest
+from board import Chess
+from movegen import see
+from moves import from_uci
+
+
+@pytest.mark.parametrize('fen, uci, value', [
+    ('4k3/8/8/3n4/4P3/8/8/4K3 w - - 0 1', 'e4d5', 320),  # Undefended knight
+    ('4k3/8/2p5/3p4/8/8/8/3RK3 w - - 0 1', 'd1d5', -400),  # Rook for a defended pawn
+    ('3rk3/8/8/3p4/8/8/3R4/3RK3 w - - 0 1', 'd2d5', 100),  # The rook behind joins in (x-ray)
+    ('4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1', 'e5d6', 100),  # En passant
+    ('4k3/5p2/8/8/8/8/8/4KQ2 w - - 0 1', 'f1f7', -800),  # The king recaptures
+    ('4k3/5p2/8/8/2B5/8/8/4KQ2 w - - 0 1', 'f1f7', 100),  # The king cannot recapture a defended piece
+])
+def test_static_exchange_evaluation(fen, uci, value):
+    game = Chess(fen)
+    before = game.to_fen()
+    assert see(game, from_uci(game, uci)) == value
+    assert game.to_fen() == before  # Lifted pieces are put back
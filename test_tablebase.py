@@ -0,0 +1,95 @@
+import os
+import pytest
+from board import Chess
+from ai import AI, CHECKMATE_SCORE, MATE_BOUND, TABLEBASE_WIN
+from tablebase import Tablebase, WIN, DRAW, LOSS
+
+# The table tests need python-chess and a directory holding at least the three-piece Syzygy tables
+SYZYGY_PATH = os.environ.get('SYZYGY_PATH', '')
+THREE_PIECE_TABLES = [name + extension for name in ('KQvK', 'KRvK', 'KPvK') for extension in ('.rtbw', '.rtbz')]
+
+
+@pytest.fixture(scope='module')
+def tablebase():
+    pytest.importorskip('chess.syzygy')
+    if not all(os.path.exists(os.path.join(SYZYGY_PATH, name)) for name in THREE_PIECE_TABLES):
+        pytest.skip('SYZYGY_PATH does not name a directory with the three-piece Syzygy tables')
+    tablebase = Tablebase(SYZYGY_PATH)
+    yield tablebase
+    tablebase.close()
+
+
+def test_directory_without_tables_covers_nothing(tmp_path):
+    """
+    Without table files nothing is probed, and python-chess is not needed.
+    """
+    tablebase = Tablebase(str(tmp_path))
+    game = Chess('8/8/8/4k3/8/8/8/4K3 w - - 0 1')
+    assert tablebase.max_pieces == 0
+    assert tablebase.probe_wdl(game) is None and tablebase.probe_dtz(game) is None
+    assert tablebase.probes == 0
+    assert AI(game, 1, tablebase=tablebase).tablebase_move() is None
+
+
+def test_probe_results(tablebase):
+    """
+    Wins and losses carry a DTZ of the same sign; stalemates and bare kings are draws, and positions with
+    castling rights are not covered.
+    """
+    assert tablebase.max_pieces >= 3
+    assert tablebase.probe_wdl(Chess('k7/8/1K6/8/8/8/7Q/8 w - - 0 1')) == WIN
+    assert tablebase.probe_dtz(Chess('k7/8/1K6/8/8/8/7Q/8 w - - 0 1')) > 0
+    assert tablebase.probe_wdl(Chess('k7/8/1K6/8/8/8/7R/8 b - - 0 1')) == LOSS
+    assert tablebase.probe_dtz(Chess('k7/8/1K6/8/8/8/7R/8 b - - 0 1')) < 0
+    assert tablebase.probe_wdl(Chess('k7/2Q5/8/8/8/8/8/4K3 b - - 0 1')) == DRAW  # Stalemate
+    assert tablebase.probe_wdl(Chess('8/8/8/8/8/4k3/4p3/4K3 w - - 0 1')) == DRAW  # Stalemate with a black pawn
+    assert tablebase.probe_wdl(Chess('8/8/8/4k3/8/8/8/4K3 w - - 0 1')) == DRAW
+    assert tablebase.probe_wdl(Chess('8/8/8/4k3/8/8/8/R3K3 w Q - 0 1')) is None
+    assert tablebase.hits > 0
+
+
+def test_root_move_mates_when_it_can(tablebase):
+    game = Chess('k7/8/1K6/8/8/8/7Q/8 w - - 0 1')
+    ai = AI(game, 1, tablebase=tablebase)
+    move = ai.tablebase_move()
+    assert ai.best_value == CHECKMATE_SCORE - 1
+    game.make_move(move)
+    assert ai.in_check(-1) and not game.generate_moves(-1)
+
+
+def test_root_move_promotes_to_a_queen(tablebase):
+    """
+    Both promotions win at once; the queen leaves the shorter way to the next zeroing move.
+    """
+    game = Chess('8/4P3/8/8/8/2k5/8/4K3 w - - 0 1')
+    ai = AI(game, 1, tablebase=tablebase)
+    move = ai.tablebase_move()
+    assert Chess.move_to_uci(move) == 'e7e8q'
+    assert ai.pv == [move] and ai.best_value == TABLEBASE_WIN - 1
+    assert ai.find_best_move(1) == move
+
+
+def test_root_move_in_a_lost_position_prolongs_the_defence(tablebase):
+    game = Chess('8/8/8/3k4/8/8/8/4K2Q b - - 0 1')
+    ai = AI(game, -1, tablebase=tablebase)
+    move = ai.tablebase_move()
+    assert ai.best_value > 0  # White wins
+    distances = {}
+    for candidate in game.generate_moves(-1):
+        game.make_move(candidate)
+        distances[candidate] = tablebase.probe_dtz(game)
+        game.unmake_move()
+    assert distances[move] == max(distances.values()) > 0
+
+
+def test_search_probes_positions_reached_inside_the_tree(tablebase):
+    """
+    With four pieces the root is not covered, but capturing the knight reaches a won three-piece ending.
+    """
+    game = Chess('4k3/8/8/8/8/8/3n4/3QK3 w - - 0 1')
+    ai = AI(game, 1, tablebase=tablebase)
+    hits = tablebase.hits
+    move = ai.find_best_move(2)
+    assert Chess.move_to_uci(move)[2:] == 'd2'
+    assert TABLEBASE_WIN - 2 <= ai.best_value < MATE_BOUND
+    assert tablebase.hits > hits
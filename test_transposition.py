@@ -0,0 +1,48 @@
+from board import Chess
+from ai import AI, CHECKMATE_SCORE, MATE_BOUND
+from moves import from_uci
+from transposition import TranspositionTable, EXACT, LOWER
+
+
+def test_replacement():
+    """
+    With a single bucket every key collides: the deepest result of the current search keeps the
+    depth-preferred slot, and everything else takes the always-replace slot.
+    """
+    tt = TranspositionTable(0)
+    assert tt.buckets == 1
+    tt.store(1, 5, 10, EXACT, None)
+    tt.store(2, 3, 20, EXACT, None)
+    assert tt.probe(1)[0] == 5 and tt.probe(2)[0] == 3
+    tt.store(3, 6, 30, EXACT, None)  # Deeper: the old deep entry is demoted, the shallow one is lost
+    assert tt.probe(3)[0] == 6 and tt.probe(1)[0] == 5 and tt.probe(2) is None
+    tt.store(4, 1, 40, EXACT, None)
+    assert tt.probe(3)[0] == 6 and tt.probe(4)[0] == 1 and tt.probe(1) is None
+    tt.store(3, 2, 35, LOWER, None)  # The same position is always updated in place
+    assert tt.probe(3)[:3] == (2, 35, LOWER) and tt.probe(4)[0] == 1
+    tt.new_search()
+    tt.store(5, 1, 50, EXACT, None)  # Entries of an older search give way to shallower ones
+    assert tt.probe(5)[0] == 1 and tt.probe(3)[0] == 2
+    assert tt.stats()['replacements'] == 3 and tt.hits + tt.misses == 12
+
+
+def test_mate_scores_are_stored_relative_to_the_node():
+    score = CHECKMATE_SCORE - 7  # Mate in 7 plies from the root, found 4 plies deep
+    stored = AI.score_to_tt(score, 4)
+    assert stored == CHECKMATE_SCORE - 3
+    assert AI.score_from_tt(stored, 2) == CHECKMATE_SCORE - 5  # The same node reached 2 plies from the root
+    assert AI.score_from_tt(AI.score_to_tt(-score, 4), 2) == -(CHECKMATE_SCORE - 5)
+    assert AI.score_to_tt(MATE_BOUND, 4) == MATE_BOUND and AI.score_from_tt(-250, 9) == -250
+
+
+def test_mate_distance_survives_the_table():
+    """
+    A mate in three plies keeps its distance at the root and is stored as a mate in one after two plies.
+    """
+    game = Chess('k7/8/2K5/8/8/8/8/1R6 w - - 0 1')
+    ai = AI(game, 1)
+    move = ai.find_best_move(5)
+    assert Chess.move_to_uci(move) == 'c6c7' and ai.best_value == CHECKMATE_SCORE - 3
+    for uci in ('c6c7', 'a8a7'):
+        game.make_move(from_uci(game, uci))
+    assert ai.tt.probe(game.hash)[1] == CHECKMATE_SCORE - 1
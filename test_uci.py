@@ -0,0 +1,60 @@
+import time
+from board import Chess
+from uci import UCIEngine
+
+OPENING = ('e2e4', 'e7e5', 'g1f3')
+
+
+def session():
+    lines = []
+    return UCIEngine(output=lines.append), lines
+
+
+def legal_bestmove(line, moves):
+    """
+    Checks that a 'bestmove' line names a legal move after the opening.
+    """
+    game = Chess()
+    for text in moves:
+        game.make_move(game.parse_uci(text))
+    name, move = line.split()[:2]
+    return name == 'bestmove' and game.parse_uci(move) is not None
+
+
+def test_handshake():
+    engine, lines = session()
+    assert engine.handle('uci') and lines[-1] == 'uciok'
+    assert any(line.startswith('id name') for line in lines)
+    engine.handle('isready')
+    assert lines[-1] == 'readyok'
+    assert engine.handle('quit') is False
+
+
+def test_position_and_go_depth():
+    engine, lines = session()
+    engine.handle('position startpos moves ' + ' '.join(OPENING))
+    assert engine.game.p_move == -1 and len(engine.game.stack) == 3
+    engine.handle('go depth 2')
+    engine.wait()
+    assert [line.split()[2] for line in lines if line.startswith('info depth')] == ['1', '2']
+    assert legal_bestmove(lines[-1], OPENING)
+
+
+def test_go_infinite_waits_for_stop():
+    """
+    An infinite search holds its bestmove until 'stop', even after finding a mate.
+    """
+    engine, lines = session()
+    engine.handle('position fen k7/8/1K6/8/8/8/7R/8 w - - 0 1')  # Mate in one
+    engine.handle('go infinite')
+    deadline = time.perf_counter() + 10
+    while not any(line.startswith('info') for line in lines) and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    assert not any(line.startswith('bestmove') for line in lines)
+    engine.handle('stop')
+    assert lines[-1] == 'bestmove h2h8'
+    engine.handle('position startpos')
+    engine.handle('go infinite')
+    engine.handle('stop')
+    assert legal_bestmove(lines[-1], ())
@@ -0,0 +1,103 @@
+# Bound types of a stored score
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class TranspositionTable:
+    # Rough memory held by one slot: the key, the entry tuple and its fields, and two list pointers
+    SLOT_BYTES = 160
+
+    def __init__(self, size_mb=16):
+        """
+        Creates a fixed-size table of two-slot buckets keyed by Zobrist hash.
+        size_mb: Approximate memory budget in megabytes.
+        """
+        self.resize(size_mb)
+
+    def resize(self, size_mb):
+        """
+        Reallocates the table for a new memory budget, dropping all entries.
+        """
+        self.size_mb = size_mb
+        self.buckets = max(1, int(size_mb * 1024 * 1024) // (2 * self.SLOT_BYTES))
+        self.clear()
+
+    def clear(self):
+        """
+        Drops all entries and resets the counters.
+        """
+        # Slot 2 * i is depth-preferred, slot 2 * i + 1 is always-replace
+        self.keys = [0] * (2 * self.buckets)
+        self.entries = [None] * (2 * self.buckets)
+        self.age = 0
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+        self.replacements = 0
+
+    def new_search(self):
+        """
+        Marks the start of a new search, so entries from older searches can be replaced first.
+        """
+        self.age += 1
+
+    def probe(self, key):
+        """
+        Looks up a position.
+        Returns a (depth, score, bound, move, age) tuple, or None if the position is not stored.
+        """
+        index = (key % self.buckets) << 1
+        keys = self.keys
+        if keys[index] == key and self.entries[index] is not None:
+            self.hits += 1
+            return self.entries[index]
+        if keys[index + 1] == key and self.entries[index + 1] is not None:
+            self.hits += 1
+            return self.entries[index + 1]
+        if self.entries[index] is not None or self.entries[index + 1] is not None:
+            self.collisions += 1  # The bucket holds other positions
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, score, bound, move):
+        """
+        Stores the result of searching a position to the given depth.
+        The depth-preferred slot keeps the deepest result of the current search;
+        everything else goes to the always-replace slot.
+        """
+        index = (key % self.buckets) << 1
+        keys = self.keys
+        entries = self.entries
+        entry = (depth, score, bound, move, self.age)
+        self.stores += 1
+        preferred = entries[index]
+        if preferred is None or keys[index] == key or depth >= preferred[0] or preferred[4] != self.age:
+            if preferred is not None and keys[index] != key:
+                # Demote the old deep entry instead of losing it
+                if entries[index + 1] is not None:
+                    self.replacements += 1
+                keys[index + 1] = keys[index]
+                entries[index + 1] = preferred
+            keys[index] = key
+            entries[index] = entry
+        else:
+            if entries[index + 1] is not None and keys[index + 1] != key:
+                self.replacements += 1
+            keys[index + 1] = key
+            entries[index + 1] = entry
+
+    def stats(self):
+        """
+        Returns the table counters as a dictionary.
+        """
+        probes = self.hits + self.misses
+        return {
+            'size_mb': self.size_mb,
+            'slots': 2 * self.buckets,
+            'hits': self.hits,
+            'misses': self.misses,
+            'collisions': self.collisions,
+            'stores': self.stores,
+            'replacements': self.replacements,
+            'hit_rate': self.hits / probes if probes else 0.0,
+        }
@@ -0,0 +1,204 @@
+import sys
+import threading
+import time
+from board import Chess
+from ai import AI, MAX_DEPTH, mate_in
+from parallel import ParallelAI
+from book import OpeningBook
+from tablebase import Tablebase
+
+START_EPD = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq -'
+MOVES_TO_GO = 30  # Assumed number of moves left when the GUI only sends the clock
+
+
+class UCIEngine:
+    def __init__(self, output=None):
+        """
+        Speaks the UCI protocol on top of Chess and AI. The search runs on a background thread,
+        so 'stop' and 'isready' are answered while it is thinking.
+        output: Function receiving each line to send; defaults to printing it to stdout.
+        """
+        self.output = output or (lambda line: print(line, flush=True))
+        self.game = Chess(START_EPD)
+        self.hash_mb = 16
+        self.threads = 1
+        self.book = None
+        self.tablebase = None
+        self.ai = None
+        self.stop_event = threading.Event()
+        self.search_thread = None
+        self.search_start = 0
+
+    def new_ai(self):
+        if self.ai is not None and isinstance(self.ai, ParallelAI):
+            self.ai.close()
+        if self.threads > 1:
+            self.ai = ParallelAI(self.game, self.game.p_move, self.hash_mb, self.threads, self.book, self.tablebase)
+        else:
+            self.ai = AI(self.game, self.game.p_move, self.hash_mb, self.book, self.tablebase)
+        self.ai.stop_event = self.stop_event
+        self.ai.on_iteration = self.send_info
+
+    def handle(self, line):
+        """
+        Executes one command line. Returns False on 'quit'.
+        """
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+        if command == 'uci':
+            self.output('id name Goldfish')
+            self.output('id author Goldfish developers')
+            self.output('option name Hash type spin default 16 min 1 max 1024')
+            self.output('option name Threads type spin default 1 min 1 max 64')
+            self.output('option name BookFile type string default <empty>')
+            self.output('option name SyzygyPath type string default <empty>')
+            self.output('uciok')
+        elif command == 'isready':
+            self.output('readyok')
+        elif command == 'setoption':
+            self.wait()
+            self.set_option(args)
+        elif command == 'ucinewgame':
+            self.wait()
+            if self.ai is not None:
+                self.ai.tt.clear()
+        elif command == 'position':
+            self.wait()
+            self.set_position(args)
+        elif command == 'go':
+            self.wait()
+            self.go(args)
+        elif command == 'stop':
+            self.stop()
+        elif command == 'quit':
+            self.stop()
+            if isinstance(self.ai, ParallelAI):
+                self.ai.close()
+            return False
+        return True
+
+    def set_option(self, args):
+        """
+        Handles 'setoption name <name> value <value>' for Hash (MB), Threads (worker processes)
+        BookFile (Polyglot-format book built by book.py) and SyzygyPath (directory of Syzygy tables, probed
+        through python-chess); '<empty>' disables either.
+        """
+        if 'name' not in args or 'value' not in args:
+            return
+        name = ' '.join(args[args.index('name') + 1:args.index('value')]).lower()
+        value = ' '.join(args[args.index('value') + 1:])
+        if name == 'hash':
+            self.hash_mb = max(1, int(value))
+            if self.ai is not None:
+                self.ai.tt.resize(self.hash_mb)
+        elif name == 'threads':
+            self.threads = max(1, int(value))
+            if self.ai is not None:
+                self.new_ai()
+        elif name == 'bookfile':
+            if self.book is not None:
+                self.book.close()
+            self.book = OpeningBook(value) if value and value != '<empty>' else None
+            if self.ai is not None:
+                self.ai.book = self.book
+        elif name == 'syzygypath':
+            try:
+                self.tablebase = Tablebase(value) if value and value != '<empty>' else None
+            except ImportError as error:
+                self.output(f'info string {error}')
+                self.tablebase = None
+            if self.ai is not None:
+                self.ai.tablebase = self.tablebase
+
+    def set_position(self, args):
+        """
+        Handles 'position startpos|fen <fen> [moves <move> ...]'.
+        """
+        moves = args.index('moves') if 'moves' in args else len(args)
+        if args and args[0] == 'fen':
+            self.game.reset(' '.join(args[1:moves]))
+        else:
+            self.game.reset(START_EPD)
+        for text in args[moves + 1:]:
+            move = self.game.parse_uci(text)
+            if move is None:
+                self.output(f'info string illegal move {text}')
+                break
+            self.game.make_move(move)
+
+    def go(self, args):
+        """
+        Handles 'go' with depth, movetime, nodes, wtime/btime/winc/binc/movestogo or infinite,
+        and starts the search thread.
+        """
+        options = {}
+        for i, token in enumerate(args[:-1]):
+            if token in ('depth', 'movetime', 'nodes', 'wtime', 'btime', 'winc', 'binc', 'movestogo'):
+                options[token] = int(args[i + 1])
+        depth = options.get('depth')
+        movetime_ms = options.get('movetime')
+        clock = options.get('wtime' if self.game.p_move == 1 else 'btime')
+        if movetime_ms is None and clock is not None:
+            increment = options.get('winc' if self.game.p_move == 1 else 'binc', 0)
+            movetime_ms = max(10, min(clock // options.get('movestogo', MOVES_TO_GO) + increment // 2, clock - 50))
+        if depth is None and (movetime_ms is None and 'nodes' not in options or 'infinite' in args):
+            depth = MAX_DEPTH  # Search until 'stop'
+        if self.ai is None:
+            self.new_ai()
+        self.ai.game = self.game
+        self.ai.color = self.game.p_move
+        self.stop_event.clear()
+        self.search_start = time.perf_counter()
+        infinite = 'infinite' in args
+        self.search_thread = threading.Thread(target=self.search, args=(depth, movetime_ms, options.get('nodes'), infinite),
+                                              daemon=True)
+        self.search_thread.start()
+
+    def search(self, depth, movetime_ms, max_nodes, infinite=False):
+        """
+        Runs on the search thread. An infinite search that ends by itself (a mate found, or the depth limit)
+        still holds its bestmove until 'stop', as the protocol requires.
+        """
+        move = self.ai.find_best_move(depth, movetime_ms, max_nodes)
+        if infinite:
+            self.stop_event.wait()
+        self.output(f'bestmove {Chess.move_to_uci(move) if move else "0000"}')
+
+    def send_info(self, ai):
+        """
+        Sends an 'info' line after each completed iteration. Scores are from the side to move's point of view.
+        """
+        elapsed = max(time.perf_counter() - self.search_start, 1e-6)
+        value = ai.best_value * ai.color
+        mate = mate_in(value)
+        score = f'cp {value}' if mate is None else f'mate {mate}'
+        pv = ' '.join(Chess.move_to_uci(move) for move in ai.pv)
+        tbhits = f' tbhits {ai.tablebase.hits}' if ai.tablebase is not None else ''
+        self.output(f'info depth {ai.completed_depth} seldepth {ai.seldepth} score {score} nodes {ai.nodes} '
+                    f'nps {int(ai.nodes / elapsed)} time {int(elapsed * 1000)}{tbhits} pv {pv}')
+
+    def stop(self):
+        """
+        Stops the running search; its thread still sends 'bestmove'.
+        """
+        self.stop_event.set()
+        self.wait()
+
+    def wait(self):
+        if self.search_thread is not None:
+            self.search_thread.join()
+            self.search_thread = None
+
+
+def main():
+    engine = UCIEngine()
+    for line in sys.stdin:
+        if not engine.handle(line):
+            break
+    engine.stop()
+
+
+if __name__ == '__main__':
+    main()
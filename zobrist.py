@@ -0,0 +1,39 @@
+import random
+
+# Keys are drawn from a fixed seed so that hashes are stable across runs and processes
+_rng = random.Random(20240501)
+
+# PIECE_KEYS[color][value][square], with square = row * 8 + column on Chess.board
+PIECE_KEYS = {color: [[_rng.getrandbits(64) for _ in range(64)] for _ in range(7)] for color in (1, -1)}
+SIDE_KEY = _rng.getrandbits(64)  # Black to move
+CASTLING_KEYS = [_rng.getrandbits(64) for _ in range(4)]  # In Chess.castling order: K, Q, k, q
+EN_PASSANT_KEYS = [_rng.getrandbits(64) for _ in range(8)]  # By file of the en passant square
+
+
+def castling_key(castling):
+    """
+    Returns the combined key of a [K, Q, k, q] list of castling rights.
+    """
+    key = 0
+    for right, allowed in enumerate(castling):
+        if allowed:
+            key ^= CASTLING_KEYS[right]
+    return key
+
+
+def compute_hash(game):
+    """
+    Computes the Zobrist key of a position from scratch.
+    Chess keeps its key up to date incrementally; this is used when loading a position.
+    """
+    key = 0
+    for y, row in enumerate(game.board):
+        for x, piece in enumerate(row):
+            if piece != 0:
+                key ^= PIECE_KEYS[piece.color][piece.value][y * 8 + x]
+    if game.p_move == -1:
+        key ^= SIDE_KEY
+    key ^= castling_key(game.castling)
+    if game.en_passant:
+        key ^= EN_PASSANT_KEYS[game.en_passant[1]]
+    return key